@@ -1,13 +1,19 @@
 # bot.py
 import os
+import json
+import heapq
 import asyncio
 import logging
+import itertools
+from dataclasses import dataclass
+from hashlib import blake2b
 import discord
 from discord.ext import commands
 
 from utils import live_pulse
+from utils.linking import start_external_refresh
 from utils.ftp_config import get_ftp_config
-from tracer.log_fetcher import poll_guild
+from tracer.log_fetcher import GuildPollState, poll_guild_once
 from tracer.scanner import scan_adm_line
 
 # --- Logging ---
@@ -18,67 +24,228 @@ logger = logging.getLogger(__name__)
 INTENTS = discord.Intents.default()
 BOT = commands.Bot(command_prefix="!", intents=INTENTS)
 
-# --- Poller bookkeeping per guild ---
-_poll_stops: dict[int, asyncio.Event] = {}
-_poll_tasks: dict[int, asyncio.Task] = {}
+# --- Cogs ---
+# Critical cogs load before login; rarely-used admin cogs load after on_ready
+# (before the command sync, so the tree hash covers them too).
+CRITICAL_COGS = ("cogs.trace", "cogs.link", "cogs.admin_assign")
+DEFERRED_COGS = (
+    "cogs.admin_ftp",
+    "cogs.admin_links",
+    "cogs.admin_misc",
+    "cogs.help",
+    "cogs.show_tracked",
+)
+
+async def _load_deferred_cogs():
+    for ext in DEFERRED_COGS:
+        if ext in BOT.extensions:
+            continue
+        try:
+            await BOT.load_extension(ext)
+        except Exception as e:
+            logger.error(f"Failed to load {ext}: {e}", exc_info=True)
+        await asyncio.sleep(0)
+
+# --- Slash command sync gating ---
+# Hash of the command tree we last pushed to Discord; a sync only happens
+# when the local tree differs (saves the HTTP call + the daily sync quota).
+_LAST_SYNC_HASH_PATH = ".last_sync_hash"
+# Optional guild id to sync into instead of globally (dev builds).
+SYNC_SCOPE = (os.environ.get("DISCORD_SYNC_SCOPE") or "").strip() or None
+
+# --- Poller scheduling (one runner multiplexes every guild) ---
+@dataclass(slots=True)
+class GuildPoller:
+    """Everything the scheduler tracks for one guild, in one record."""
+    state: GuildPollState
+    ticket: int = -1                    # matches the live heap entry
+    task: asyncio.Task | None = None    # in-flight cycle, if any
+
+# Min-heap of (due_time, ticket, guild_id). A heap entry is live only while
+# its ticket matches the guild's GuildPoller; stale entries are skipped on pop.
+_poll_due: list[tuple[float, int, int]] = []
+_pollers: dict[int, GuildPoller] = {}
+_poll_ticket_seq = itertools.count()
+# Created lazily by the runner; nothing to signal until it is waiting.
+_poll_wake: asyncio.Event | None = None
+_poll_runner: asyncio.Task | None = None
+_START_POLLS_CONCURRENCY = 16
 
 async def line_callback(guild_id: int, line: str, source_ref: str, ts):
     """Pass each ADM line to the scanner."""
     await scan_adm_line(guild_id, line, source_ref, ts)
 
+def _schedule_poll(guild_id: int, poller: GuildPoller, due: float):
+    poller.ticket = next(_poll_ticket_seq)
+    heapq.heappush(_poll_due, (due, poller.ticket, guild_id))
+    if _poll_wake is not None:
+        _poll_wake.set()
+
+async def _poll_step(guild_id: int, poller: GuildPoller):
+    """Run one poll cycle, then put the guild back on the wheel."""
+    loop = asyncio.get_running_loop()
+    try:
+        await poll_guild_once(poller.state, line_callback)
+    except Exception as e:
+        logger.error(f"[Guild {guild_id}] poller crashed: {e}", exc_info=True)
+    finally:
+        poller.task = None
+        # Only reschedule if the guild wasn't stopped/restarted meanwhile.
+        if _pollers.get(guild_id) is poller:
+            _schedule_poll(guild_id, poller, loop.time() + poller.state.interval)
+
+async def _multiplex_runner():
+    """
+    Single scheduler for all guild pollers. Pops whichever guild is due next
+    and runs its cycle as a short-lived task, so one slow FTP server doesn't
+    hold up everyone else.
+    """
+    global _poll_wake
+    if _poll_wake is None:
+        _poll_wake = asyncio.Event()
+    loop = asyncio.get_running_loop()
+    while True:
+        _poll_wake.clear()
+        now = loop.time()
+        while _poll_due and _poll_due[0][0] <= now:
+            _, ticket, gid = heapq.heappop(_poll_due)
+            poller = _pollers.get(gid)
+            if poller is None or poller.ticket != ticket:
+                continue  # stale entry (guild stopped or rescheduled)
+            poller.task = asyncio.create_task(_poll_step(gid, poller), name=f"poll:{gid}")
+        delay = (_poll_due[0][0] - now) if _poll_due else None
+        try:
+            async with asyncio.timeout(delay):
+                await _poll_wake.wait()
+        except TimeoutError:
+            pass
+
+def _ensure_runner():
+    global _poll_runner
+    if _poll_runner is None or _poll_runner.done():
+        _poll_runner = asyncio.create_task(_multiplex_runner(), name="poller:multiplex")
+
 async def start_poll_for_guild(guild_id: int):
     """Start a poller for a single guild if FTP config exists."""
-    if guild_id in _poll_tasks and not _poll_tasks[guild_id].done():
+    if guild_id in _pollers:
         return  # already running
 
-    cfg = get_ftp_config(guild_id)
+    # Config read + mirror priming hit disk; keep them off the event loop.
+    cfg = await asyncio.to_thread(get_ftp_config, guild_id)
     if not cfg:
         logger.info(f"[Guild {guild_id}] No FTP config; poller not started.")
         return
 
-    stop_event = asyncio.Event()
-    _poll_stops[guild_id] = stop_event
-
-    async def _runner():
-        try:
-            await poll_guild(guild_id, line_callback, stop_event)
-        except Exception as e:
-            logger.error(f"[Guild {guild_id}] poller crashed: {e}", exc_info=True)
-
-    task = asyncio.create_task(_runner(), name=f"poller:{guild_id}")
-    _poll_tasks[guild_id] = task
-    logger.info(f"[Guild {guild_id}] FTP poller started.")
+    state = await asyncio.to_thread(GuildPollState, guild_id, cfg)
+    if guild_id in _pollers:
+        return  # started concurrently while we were loading
+    poller = _pollers[guild_id] = GuildPoller(state)
+    _schedule_poll(guild_id, poller, asyncio.get_running_loop().time())
+    _ensure_runner()
+    logger.info(f"[Guild {guild_id}] FTP poller started (dir={state.directory}, every {state.interval}s).")
 
 async def stop_poll_for_guild(guild_id: int):
     """Stop a running poller for a guild."""
-    ev = _poll_stops.get(guild_id)
-    if ev and not ev.is_set():
-        ev.set()
-    task = _poll_tasks.get(guild_id)
+    poller = _pollers.pop(guild_id, None)
+    task = poller.task if poller else None
     if task and not task.done():
         try:
-            await asyncio.wait_for(task, timeout=2.0)
-        except asyncio.TimeoutError:
+            async with asyncio.timeout(2.0):
+                await task
+        except TimeoutError:
             task.cancel()
-    _poll_stops.pop(guild_id, None)
-    _poll_tasks.pop(guild_id, None)
+            try:
+                await task
+            except asyncio.CancelledError:
+                # the poller's own cancellation is expected; ours (e.g. shutdown) is not
+                current = asyncio.current_task()
+                if current is not None and current.cancelling():
+                    raise
+    if poller:
+        poller.state.write_mirror(" (poller stopped)", force=True)
+        poller.state.close_ftp()
     logger.info(f"[Guild {guild_id}] FTP poller stopped.")
 
+def _command_payload(cmd) -> dict:
+    """Serializable view of a command: the full payload Discord would receive."""
+    try:
+        data = cmd.to_dict(BOT.tree)
+    except TypeError:
+        # discord.py < 2.4: to_dict() takes no tree argument
+        data = cmd.to_dict()
+    # everything, not just options: guild_only/default_permissions/nsfw changes must resync
+    return data
+
+def _command_tree_hash() -> str:
+    cmds = sorted((_command_payload(c) for c in BOT.tree.get_commands()), key=lambda c: c["name"])
+    raw = json.dumps(cmds, sort_keys=True, default=str).encode("utf-8")
+    return blake2b(raw, digest_size=8).hexdigest()
+
+def _read_last_sync_hash() -> str | None:
+    try:
+        with open(_LAST_SYNC_HASH_PATH, "r", encoding="utf-8") as f:
+            return f.read().strip() or None
+    except OSError:
+        return None
+
+def _write_last_sync_hash(h: str) -> None:
+    try:
+        with open(_LAST_SYNC_HASH_PATH, "w", encoding="utf-8") as f:
+            f.write(h)
+    except OSError as e:
+        logger.warning(f"Could not persist command sync hash: {e}")
+
+async def _maybe_sync(scope: str | None):
+    """
+    Bulk-overwrite the command tree (one PUT). With a guild id as scope the
+    global commands are copied into that guild, which shows up instantly
+    (handy for dev); otherwise sync globally.
+    """
+    if scope:
+        guild = discord.Object(int(scope))
+        BOT.tree.copy_global_to(guild=guild)
+        return await BOT.tree.sync(guild=guild)
+    return await BOT.tree.sync()
+
+async def sync_commands_if_changed():
+    """Sync the slash command tree only when it differs from the last sync."""
+    # Include the scope so switching dev guild <-> global forces a sync.
+    current = f"{SYNC_SCOPE or 'global'}:{_command_tree_hash()}"
+    if current == _read_last_sync_hash():
+        logger.info(f"Command tree unchanged (#{current}); skipping sync.")
+        return
+    synced = await _maybe_sync(SYNC_SCOPE)
+    _write_last_sync_hash(current)
+    logger.info(f"Synced {len(synced)} command(s) (#{current}).")
+
 async def start_polls():
     """Start pollers for all guilds with configs."""
     await BOT.wait_until_ready()
-    for g in BOT.guilds:
-        await start_poll_for_guild(g.id)
+    sem = asyncio.Semaphore(_START_POLLS_CONCURRENCY)
+
+    async def _one(gid: int):
+        async with sem:
+            try:
+                await start_poll_for_guild(gid)
+            except Exception as e:
+                logger.error(f"[Guild {gid}] poller start failed: {e}", exc_info=True)
+
+    await asyncio.gather(*(_one(g.id) for g in BOT.guilds))
 
 @BOT.event
 async def on_ready():
     logger.info(f"Logged in as {BOT.user} ({BOT.user.id})")
+    # on_ready fires again on every reconnect; only sync/start pollers once.
+    if getattr(BOT, "_synced_once", False):
+        return
+    BOT._synced_once = True
+    await _load_deferred_cogs()
     try:
-        synced = await BOT.tree.sync()
-        logger.info(f"Synced {len(synced)} command(s).")
+        await sync_commands_if_changed()
     except Exception as e:
         logger.error(f"Slash sync failed: {e}", exc_info=True)
     asyncio.create_task(start_polls())
+    start_external_refresh(BOT)
 
 @BOT.event
 async def on_guild_join(guild: discord.Guild):
@@ -105,15 +272,9 @@ async def main():
         # Allow live pulse to edit messages & subscribe to tracker events
         live_pulse.init(BOT)
 
-        # Load cogs
-        await BOT.load_extension("cogs.admin_assign")
-        await BOT.load_extension("cogs.admin_ftp")
-        await BOT.load_extension("cogs.admin_links")
-        await BOT.load_extension("cogs.link")
-        await BOT.load_extension("cogs.trace")
-        await BOT.load_extension("cogs.admin_misc")
-        await BOT.load_extension("cogs.help")
-        await BOT.load_extension("cogs.show_tracked")
+        # Load the core cogs up front; the rest follow once we're connected.
+        for ext in CRITICAL_COGS:
+            await BOT.load_extension(ext)
 
         token = os.environ.get("DISCORD_TOKEN")
         if not token:
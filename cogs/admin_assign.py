@@ -5,15 +5,8 @@ from discord.ext import commands
 from typing import Optional
 
 from utils.settings import load_settings, save_settings
-from tracer.config import MAPS
-
-
-# -------- admin gate (local) ----------
-def admin_check():
-    def pred(i: discord.Interaction):
-        perms = getattr(i.user, "guild_permissions", None)
-        return bool(perms and (perms.administrator or perms.manage_guild))
-    return app_commands.check(lambda i: pred(i))
+from tracer.config import MAPS, MAPS_BY_KEY_CF, MAPS_BY_NAME_CF
+from utils.admin import admin_check
 
 
 # ---------- map helpers (canonical keys) ----------
@@ -23,19 +16,8 @@ def _resolve_map_key(value: Optional[str]) -> Optional[str]:
     """
     if not value:
         return None
-    val = value.strip()
-
-    # direct key (case-insensitive)
-    for k in MAPS.keys():
-        if k.casefold() == val.casefold():
-            return k
-
-    # display name match (case-insensitive)
-    for k, cfg in MAPS.items():
-        name = str(cfg.get("name", "")).strip()
-        if name and name.casefold() == val.casefold():
-            return k
-    return None
+    v = value.strip().casefold()
+    return MAPS_BY_KEY_CF.get(v) or MAPS_BY_NAME_CF.get(v)
 
 
 def _map_display_name(key: Optional[str]) -> str:
@@ -54,7 +36,7 @@ class AdminAssign(commands.Cog):
         name="setchannel",
         description="Set the PRIVATE admin channel (trace output)."
     )
-    @admin_check()
+    @admin_check
     @app_commands.describe(
         admin_channel="Private admin channel (trace output, internal logs)"
     )
@@ -73,7 +55,7 @@ class AdminAssign(commands.Cog):
         )
 
     @app_commands.command(name="settings", description="Show current bot settings")
-    @admin_check()
+    @admin_check
     async def settings(self, interaction: discord.Interaction):
         gid = interaction.guild_id
         s = load_settings(gid) or {}
@@ -1,20 +1,15 @@
 # cogs/admin_ftp.py
 import json
+import os
 import re
 import discord
 from discord import app_commands
 from discord.ext import commands
 
-from utils.ftp_config import set_ftp_config, get_ftp_config, clear_ftp_config
+from utils.ftp_config import FTP_STORE, set_ftp_config, get_ftp_config, clear_ftp_config
 from utils.settings import save_settings
-from tracer.config import MAPS
-
-
-def admin_check():
-    def pred(i: discord.Interaction):
-        perms = getattr(i.user, "guild_permissions", None)
-        return bool(perms and (perms.administrator or perms.manage_guild))
-    return app_commands.check(lambda i: pred(i))
+from tracer.config import MAPS, MAPS_BY_KEY_CF, MAPS_BY_NAME_CF, MAP_CHOICES
+from utils.admin import admin_check
 
 
 def _redact_config(d: dict) -> dict:
@@ -27,20 +22,35 @@ def _redact_config(d: dict) -> dict:
     return redacted
 
 
+# Redacted pretty JSON per guild, keyed on the config file's (st_mtime_ns, st_size)
+# so any write to it (commands, other processes, hand edits) is picked up.
+_REDACTED_CACHE: dict[int, tuple[tuple[int, int], str]] = {}
+
+
+def _redacted_json(gid: int, cfg: dict) -> str:
+    try:
+        st = os.stat(FTP_STORE)
+        key = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        key = None
+    hit = _REDACTED_CACHE.get(gid)
+    if key is not None and hit and hit[0] == key:
+        return hit[1]
+    text = json.dumps(_redact_config(cfg), indent=2)
+    if key is not None:
+        _REDACTED_CACHE[gid] = (key, text)
+    return text
+
+
 # ---- map helpers (local, tiny) ---------------------------------------------
 def _resolve_map_key(raw: str | None) -> str | None:
     if not raw:
         return None
     k = raw.strip().casefold()
-    # direct key
-    for key in MAPS.keys():
-        if key.casefold() == k:
-            return key
-    # display name
-    for key, cfg in MAPS.items():
-        if str(cfg.get("name", key)).strip().casefold() == k:
-            return key
-    return None
+    return MAPS_BY_KEY_CF.get(k) or MAPS_BY_NAME_CF.get(k)
+
+# Built once; discord.py wants a list of Choice objects, not a tuple.
+MAP_APP_CHOICES = [app_commands.Choice(name=name, value=key) for name, key in MAP_CHOICES]
 
 def _map_display_name(key: str) -> str:
     cfg = MAPS.get(key) or {}
@@ -48,15 +58,30 @@ def _map_display_name(key: str) -> str:
 # ---------------------------------------------------------------------------
 
 
+_SEGMENT_ALLOWED = "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789._-"
+_SEGMENT_ALLOWED_DEL = str.maketrans("", "", _SEGMENT_ALLOWED)
+_SEGMENT_BAD_RUN = re.compile(r'[^A-Za-z0-9._-]+')
+
+
 def _sanitize_segment(s: str) -> str:
     """
     Safe-ish path segment: keep letters, numbers, dot, underscore, dash.
     Replace everything else with underscore. Ensure non-empty.
     """
-    s = re.sub(r'[^A-Za-z0-9._-]+', '_', (s or '').strip())
+    s = (s or '').strip()
+    # Fast path: already clean (the usual username) -> no regex pass at all.
+    if s.isascii() and not s.translate(_SEGMENT_ALLOWED_DEL):
+        return s or "user"
+    s = _SEGMENT_BAD_RUN.sub('_', s)
     return s or "user"
 
 
+_CONSOLE_FOLDERS = {
+    "x": "dayzxb", "xb": "dayzxb", "xbox": "dayzxb", "dayzxb": "dayzxb",
+    "ps": "dayzps", "ps4": "dayzps", "ps5": "dayzps", "playstation": "dayzps", "dayzps": "dayzps",
+}
+
+
 def _norm_console_folder(value: str | None) -> str | None:
     """
     Normalize console input to the Nitrado folder segment:
@@ -66,12 +91,7 @@ def _norm_console_folder(value: str | None) -> str | None:
     """
     if not value:
         return None
-    v = value.strip().lower()
-    if v in {"x", "xb", "xbox", "dayzxb"}:
-        return "dayzxb"
-    if v in {"ps", "ps4", "ps5", "playstation", "dayzps"}:
-        return "dayzps"
-    return None
+    return _CONSOLE_FOLDERS.get(value.strip().lower())
 
 
 class AdminFTP(commands.Cog):
@@ -82,7 +102,7 @@ class AdminFTP(commands.Cog):
         name="set_creds",
         description="Configure Nitrado token/API and (optional) FTP for ADM scanning (per guild)",
     )
-    @admin_check()
+    @admin_check
     @app_commands.describe(
         nitrado_api_token="Nitrado HTTP API token (for active ADM follow)",
         nitrado_service_id="Nitrado service ID (numeric string)",
@@ -99,7 +119,7 @@ class AdminFTP(commands.Cog):
             app_commands.Choice(name="Xbox", value="xbox"),
             app_commands.Choice(name="PlayStation", value="playstation"),
         ],
-        map_choice=[app_commands.Choice(name=cfg.get("name", key), value=key) for key, cfg in MAPS.items()],
+        map_choice=MAP_APP_CHOICES,
     )
     async def set_creds(
         self,
@@ -151,7 +171,7 @@ class AdminFTP(commands.Cog):
         # Save FTP core (+ extras if supported)
         saved_extras = bool(extras)
         try:
-            set_ftp_config(
+            changed = set_ftp_config(
                 gid,
                 hostname,
                 username,
@@ -163,7 +183,7 @@ class AdminFTP(commands.Cog):
             )
         except TypeError:
             # Older helper that doesn't accept extras:
-            set_ftp_config(gid, hostname, username, password, port, adm_dir, interval_sec)
+            changed = set_ftp_config(gid, hostname, username, password, port, adm_dir, interval_sec)
             if extras:
                 saved_extras = False
 
@@ -174,12 +194,14 @@ class AdminFTP(commands.Cog):
             save_settings(gid, {"active_map": chosen_key})
             map_line = f"\nActive map: **{_map_display_name(chosen_key)}**"
 
-        # Notify the core to (re)start the poller for this guild.
-        interaction.client.dispatch("ftp_config_updated", gid)
+        # Notify the core to (re)start the poller for this guild, unless the
+        # admin re-submitted identical settings (no need to drop the FTP session).
+        if changed is not False:
+            interaction.client.dispatch("ftp_config_updated", gid)
 
         # Build a user message with secrets redacted.
         cfg = get_ftp_config(gid) or {}
-        redacted = _redact_config(cfg)
+        redacted_text = _redacted_json(gid, cfg)
 
         note = ""
         if not saved_extras:
@@ -199,23 +221,22 @@ class AdminFTP(commands.Cog):
         )
 
         await interaction.response.send_message(
-            content=f"✅ Config saved for this guild.{map_line}\n{summary}\n```json\n{json.dumps(redacted, indent=2)}\n```{note}",
+            content=f"✅ Config saved for this guild.{map_line}\n{summary}\n```json\n{redacted_text}\n```{note}",
             ephemeral=True,
         )
 
     @app_commands.command(name="show_creds", description="Show the current FTP/API config (secrets redacted)")
-    @admin_check()
+    @admin_check
     async def showftp(self, interaction: discord.Interaction):
         cfg = get_ftp_config(interaction.guild_id)
         if not cfg:
             return await interaction.response.send_message("ℹ️ No FTP config set.", ephemeral=True)
-        redacted = _redact_config(cfg)
         await interaction.response.send_message(
-            f"```json\n{json.dumps(redacted, indent=2)}\n```", ephemeral=True
+            f"```json\n{_redacted_json(interaction.guild_id, cfg)}\n```", ephemeral=True
         )
 
     @app_commands.command(name="clear_creds", description="Clear saved FTP/API configuration for this guild")
-    @admin_check()
+    @admin_check
     async def clearftp(self, interaction: discord.Interaction):
         clear_ftp_config(interaction.guild_id)
         interaction.client.dispatch("ftp_config_updated", interaction.guild_id)
@@ -1,39 +1,68 @@
 # cogs/admin_links.py
 from __future__ import annotations
 
+import asyncio
 import base64
+import functools
 import json
 import os
+import re
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
 from hashlib import blake2b
-from urllib.request import Request, urlopen
-from urllib.error import URLError, HTTPError
 from typing import Any, Tuple
 
+import aiohttp
 import discord
+
+try:  # optional: much faster (de)serialization for multi-MB link files
+    import orjson
+except ImportError:
+    orjson = None
+
+try:  # optional: SIMD hashing for content tags (blake2b otherwise)
+    from blake3 import blake3
+except ImportError:
+    blake3 = None
 from discord import app_commands
 from discord.ext import commands
 
 from utils.settings import load_settings, save_settings
-from utils.storageClient import load_file, save_file  # used for JSON (local or remote)
+from utils.storageClient import load_file_raw, save_file  # used for JSON (local or remote)
+from utils.admin import admin_check
+
 
+# ============================= guardrail helpers =============================
 
-def admin_check():
-    def pred(i: discord.Interaction):
-        perms = getattr(i.user, "guild_permissions", None)
-        return bool(perms and (perms.administrator or perms.manage_guild))
-    return app_commands.check(lambda i: pred(i))
+def _dumps(obj: Any, indent: bool = True) -> str:
+    """json.dumps(obj, ensure_ascii=False[, indent=2]) via orjson when available."""
+    if orjson is not None:
+        opt = orjson.OPT_NON_STR_KEYS | (orjson.OPT_INDENT_2 if indent else 0)
+        return orjson.dumps(obj, option=opt).decode("utf-8")
+    return json.dumps(obj, ensure_ascii=False, indent=2 if indent else None)
 
 
-# ============================= guardrail helpers =============================
+def _loads(data: str | bytes) -> Any:
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+_URL_RE = re.compile(r"https?://", re.IGNORECASE)
+
+
+def _is_url(p: str) -> bool:
+    return _URL_RE.match(p) is not None
+
+
+# Deleting every valid base64/whitespace byte leaves b"" iff the input is clean.
+_B64_VALID = b"ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=\n\r\t "
+
 
 def _looks_base64(s: str) -> bool:
     s = s.strip()
-    if not s:
+    if not s or not s.isascii():
         return False
-    for ch in s:
-        if ch not in "ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz0123456789+/=\n\r\t ":
-            return False
-    return True
+    return not s.encode("ascii").translate(None, _B64_VALID)
 
 
 def unwrap_links_json(obj: Any) -> Tuple[Any, bool, str]:
@@ -42,6 +71,10 @@ def unwrap_links_json(obj: Any) -> Tuple[Any, bool, str]:
       {"data": "<base64-json>"}  or  {"data": "<raw json string>"}  or  {"data": {...}}
     Returns (plain_obj, changed, reason). Handles accidental double-wraps.
     """
+    # Fast path: plain payloads (the common case) aren't single-key {"data": ...}.
+    if not (isinstance(obj, dict) and len(obj) == 1 and "data" in obj):
+        return obj, False, "no wrapper"
+
     changed_any = False
     reason = "no wrapper"
     seen = 0
@@ -59,7 +92,7 @@ def unwrap_links_json(obj: Any) -> Tuple[Any, bool, str]:
         if isinstance(d, str) and _looks_base64(d):
             try:
                 decoded = base64.b64decode(d, validate=True).decode("utf-8", "ignore")
-                obj = json.loads(decoded)
+                obj = _loads(decoded)
                 changed_any = True
                 reason = "unwrapped base64→JSON"
                 continue
@@ -68,7 +101,7 @@ def unwrap_links_json(obj: Any) -> Tuple[Any, bool, str]:
         # raw JSON string
         if isinstance(d, str):
             try:
-                obj = json.loads(d)
+                obj = _loads(d)
                 changed_any = True
                 reason = "unwrapped raw JSON string"
                 continue
@@ -79,51 +112,128 @@ def unwrap_links_json(obj: Any) -> Tuple[Any, bool, str]:
     return obj, changed_any, reason
 
 
-def _read_http_json_and_text(url: str, timeout: float = 8.0) -> tuple[dict, str]:
-    """Fetch JSON from HTTP(S). Returns (parsed_dict, raw_text)."""
-    req = Request(url, headers={"User-Agent": "SV-Bounties/links-check"})
-    with urlopen(req, timeout=timeout) as resp:  # nosec - admin-provided URL
-        charset = resp.headers.get_content_charset() or "utf-8"
-        raw = resp.read().decode(charset, errors="replace")
-    return json.loads(raw), raw
+_UNWRAP_CACHE: OrderedDict[str, tuple[Any, bool, str]] = OrderedDict()
+_UNWRAP_CACHE_MAX = 32
+
+
+def unwrap_links_json_cached(obj: Any, content_hash: str | None) -> Tuple[Any, bool, str]:
+    """unwrap_links_json memoized (LRU) on the raw document's content tag."""
+    if not content_hash or content_hash == "n/a":
+        return unwrap_links_json(obj)
+    hit = _UNWRAP_CACHE.get(content_hash)
+    if hit is not None:
+        _UNWRAP_CACHE.move_to_end(content_hash)
+        return hit
+    result = unwrap_links_json(obj)
+    _UNWRAP_CACHE[content_hash] = result
+    if len(_UNWRAP_CACHE) > _UNWRAP_CACHE_MAX:
+        _UNWRAP_CACHE.popitem(last=False)
+    return result
+
+
+_http_session: aiohttp.ClientSession | None = None
+
+
+def _get_http_session() -> aiohttp.ClientSession:
+    global _http_session
+    if _http_session is None or _http_session.closed:
+        # One keep-alive pool for every fetch: later requests to the same host
+        # reuse the TCP/TLS connection instead of handshaking again.
+        _http_session = aiohttp.ClientSession(
+            headers={"User-Agent": "SV-Bounties/links-check"},
+            timeout=aiohttp.ClientTimeout(total=10),
+            connector=aiohttp.TCPConnector(limit=8, ttl_dns_cache=300),
+        )
+    return _http_session
+
+
+# Spares remote hosts from admin click-spam.
+_HTTP_CACHE_TTL_SEC = 60
+# url -> (fetched_at, doc, raw_text, validators), LRU. After the TTL we
+# revalidate with If-None-Match / If-Modified-Since and keep the body on a 304.
+_http_cache: OrderedDict[str, tuple[float, dict, str, dict[str, str]]] = OrderedDict()
+_HTTP_CACHE_MAX = 16
+
+
+def _remember_http(url: str, entry: tuple[float, dict, str, dict[str, str]]) -> None:
+    _http_cache[url] = entry
+    _http_cache.move_to_end(url)
+    if len(_http_cache) > _HTTP_CACHE_MAX:
+        _http_cache.popitem(last=False)
+
+
+async def _read_http_json_and_text(url: str, timeout: float = 8.0) -> tuple[dict, str]:
+    """Fetch JSON from HTTP(S) without blocking the event loop. Returns (parsed_dict, raw_text)."""
+    hit = _http_cache.get(url)
+    if hit and time.monotonic() - hit[0] <= _HTTP_CACHE_TTL_SEC:
+        _http_cache.move_to_end(url)
+        return hit[1], hit[2]
+    headers = {}
+    if hit:
+        if "etag" in hit[3]:
+            headers["If-None-Match"] = hit[3]["etag"]
+        if "last_modified" in hit[3]:
+            headers["If-Modified-Since"] = hit[3]["last_modified"]
+    async with asyncio.timeout(timeout):
+        async with _get_http_session().get(url, headers=headers) as resp:  # nosec - admin-provided URL
+            if resp.status == 304 and hit:
+                _remember_http(url, (time.monotonic(), hit[1], hit[2], hit[3]))
+                return hit[1], hit[2]
+            resp.raise_for_status()
+            raw = await resp.text(errors="replace")
+            validators = {}
+            if resp.headers.get("ETag"):
+                validators["etag"] = resp.headers["ETag"]
+            if resp.headers.get("Last-Modified"):
+                validators["last_modified"] = resp.headers["Last-Modified"]
+    doc = _loads(raw)
+    _remember_http(url, (time.monotonic(), doc, raw, validators))
+    return doc, raw
+
+
+# path -> (st_mtime_ns, st_size, result). Unchanged files cost one stat().
+_local_cache: dict[str, tuple[int, int, tuple[bool, str, dict | None, str | None]]] = {}
 
 
 def _try_local_json_and_text(path: str) -> tuple[bool, str, dict | None, str | None]:
     """
     Try reading JSON via storageClient first, then direct FS.
     Returns (ok, detail, data_or_none, raw_text_or_none).
+    Successful reads are cached until the file's mtime/size change.
     """
     try:
-        data = load_file(path)
-    except Exception:
-        data = None
-
-    if isinstance(data, dict):
-        try:
-            raw = json.dumps(data, ensure_ascii=False, indent=2)
-        except Exception:
-            raw = None
-        return True, "ok", data, raw
-
-    if isinstance(data, str):
-        try:
-            doc = json.loads(data)
-            return True, "ok", doc, data
-        except Exception:
-            pass
-
-    # Fallback to filesystem
-    try:
-        if os.path.isfile(path):
-            with open(path, "r", encoding="utf-8") as f:
-                raw = f.read()
-            doc = json.loads(raw)
-            if isinstance(doc, dict):
-                return True, "ok", doc, raw
-            return False, "file found but not a JSON object", None, None
+        st = os.stat(path)
+    except OSError:
+        st = None
+    if st is not None:
+        hit = _local_cache.get(path)
+        if hit and hit[0] == st.st_mtime_ns and hit[1] == st.st_size:
+            return hit[2]
+    result = _read_local_json_and_text(path)
+    if st is not None and result[0]:
+        _local_cache[path] = (st.st_mtime_ns, st.st_size, result)
+    return result
+
+
+def _read_local_json_and_text(path: str) -> tuple[bool, str, dict | None, str | None]:
+    # storageClient hands back the text it parsed, so the raw form used for
+    # hashing/preview never has to be re-serialized from the dict.
+    if not os.path.exists(path):
         return False, "file not found", None, None
+    try:
+        doc, raw = load_file_raw(path)
     except Exception as e:
         return False, f"{type(e).__name__}: {e}", None, None
+    if raw is None:
+        return False, "file not readable", None, None
+    if isinstance(doc, dict):
+        return True, "ok", doc, raw
+    if doc is None:
+        try:
+            _loads(raw)
+        except Exception as e:
+            return False, f"{type(e).__name__}: {e}", None, None
+    return False, "file found but not a JSON object", None, None
 
 
 def _size_hint(doc: dict) -> int:
@@ -134,23 +244,305 @@ def _size_hint(doc: dict) -> int:
     return len(doc)
 
 
-def _content_hash(raw_text: str | None) -> str:
-    if not raw_text:
+_SIZE_HINT_KEYS = ("links", "players", "mapping", "map", "by_id", "by_name")
+_STREAM_MIN_BYTES = 256 * 1024  # only stream-parse files >= 256 KiB
+_VALUE_EVENTS = frozenset(("start_map", "start_array", "string", "number", "boolean", "null"))
+
+
+@functools.cache
+def _ijson():
+    """ijson, imported on first big-file summary (optional; None if not installed)."""
+    try:
+        import ijson
+    except ImportError:
+        return None
+    return ijson
+
+
+def _stream_local_summary(path: str, max_chars: int = 900) -> dict | None:
+    """
+    Summarize a large local JSON object with ijson, without materializing it:
+    top-level keys, _size_hint-equivalent count, content hash, text preview.
+    Returns None when ijson is missing, the file is small/absent, or it's a
+    {"data": ...} wrapper (those need the full document to unwrap).
+    """
+    if not os.path.isfile(path) or os.path.getsize(path) < _STREAM_MIN_BYTES:
+        return None
+    ijson = _ijson()
+    if ijson is None:
+        return None
+    top_keys: list[str] = []
+    counts: dict[str, int] = {}
+    with open(path, "rb") as f:
+        events = ijson.parse(f)
+        _, first_event, _ = next(events, ("", None, None))
+        if first_event != "start_map":
+            return None
+        for prefix, event, value in events:
+            if prefix == "":
+                if event == "map_key":
+                    top_keys.append(value)
+                continue
+            if prefix in _SIZE_HINT_KEYS:
+                # direct children of a dict value
+                if event == "map_key":
+                    counts[prefix] = counts.get(prefix, 0) + 1
+                elif event in ("start_map", "start_array"):
+                    counts.setdefault(prefix, 0)
+            elif prefix.endswith(".item") and prefix[:-5] in _SIZE_HINT_KEYS and event in _VALUE_EVENTS:
+                # direct items of a list value (nested events use longer prefixes)
+                counts[prefix[:-5]] = counts.get(prefix[:-5], 0) + 1
+    if top_keys == ["data"]:
+        return None
+
+    size_hint = next((counts[k] for k in _SIZE_HINT_KEYS if k in counts), len(top_keys))
+    h = _new_hasher()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(65536), b""):
+            h.update(chunk)
+    with open(path, "r", encoding="utf-8", errors="replace") as f:
+        preview = _preview_text(f.read(max_chars + 1), max_chars)
+    return {
+        "top_keys": top_keys,
+        "size_hint": size_hint,
+        "hash": _hex_tag(h),
+        "preview": preview,
+    }
+
+
+_HASH_CHUNK_CHARS = 1 << 16
+
+
+def _new_hasher():
+    return blake3() if blake3 is not None else blake2b(digest_size=8)
+
+
+def _hex_tag(h) -> str:
+    return f"#{h.hexdigest(8) if blake3 is not None else h.hexdigest()}"
+
+
+def _content_hash(raw: str | bytes | None) -> str:
+    """
+    Short content tag for a document (blake3 if installed, else blake2b).
+    Bytes are hashed as-is; text is encoded in 64K-char slices so no full
+    UTF-8 copy of a large link file is ever built.
+    """
+    if not raw:
         return "n/a"
-    h = blake2b(raw_text.encode("utf-8", "ignore"), digest_size=8).hexdigest()
-    return f"#{h}"
+    h = _new_hasher()
+    if isinstance(raw, (bytes, bytearray, memoryview)):
+        h.update(raw)
+        return _hex_tag(h)
+    for i in range(0, len(raw), _HASH_CHUNK_CHARS):
+        h.update(raw[i:i + _HASH_CHUNK_CHARS].encode("utf-8", "ignore"))
+    return _hex_tag(h)
 
 
 def _preview_text(text: str, max_chars: int = 900) -> str:
     return (text[: max_chars - 1] + "…") if len(text) > max_chars else text
 
 
+_BOUNDED_PREVIEW_MIN_ITEMS = 4096
+_PRETTY_ENCODER = json.JSONEncoder(ensure_ascii=False, indent=2)
+
+
+def _hash_and_preview(doc: Any, max_chars: int = 900) -> tuple[str, str]:
+    """
+    Content tag + ~max_chars preview of doc's pretty JSON in one lazy
+    iterencode pass: the full serialized text is never held in memory.
+    """
+    h = _new_hasher()
+    head: list[str] = []
+    head_len = 0
+    for chunk in _PRETTY_ENCODER.iterencode(doc):
+        h.update(chunk.encode("utf-8", "ignore"))
+        if head_len <= max_chars:
+            head.append(chunk)
+            head_len += len(chunk)
+    return _hex_tag(h), _preview_text("".join(head), max_chars)
+
+
+def _preview_json_bounded(doc: Any, max_chars: int = 900) -> str:
+    """Like _preview_json(doc, None) but stops encoding once max_chars is reached."""
+    parts: list[str] = []
+    n = 0
+    for chunk in _PRETTY_ENCODER.iterencode(doc):
+        parts.append(chunk)
+        n += len(chunk)
+        if n > max_chars:
+            break
+    return _preview_text("".join(parts), max_chars)
+
+
 def _preview_json(doc: dict, raw_text: str | None, max_chars: int = 900) -> str:
+    if raw_text:
+        return _preview_text(raw_text, max_chars)
+    try:
+        return _preview_json_bounded(doc, max_chars)
+    except Exception:
+        return _preview_text(_dumps(doc, indent=False), max_chars)
+
+
+@dataclass(slots=True)
+class LinksResult:
+    chosen: str
+    prefer_external: bool
+    disable_local: bool
+    base: str
+    external_path: str
+    src_used: str = "none"
+    load_ok: bool = False
+    detail: str = ""
+    top_keys: str = "—"
+    size_hint: int = 0
+    hash_raw: str = "n/a"
+    hash_decoded: str | None = None
+    snapshot: str | None = None
+    doc_type: str = "dict"
+
+
+@dataclass(slots=True)
+class WalletResult:
+    explicit: str
+    candidates: list[str]
+    chosen: str | None = None
+    raw: str | None = None
+    note: str = ""
+
+
+def _apply_stream_summary(res: LinksResult, summary: dict) -> None:
+    res.hash_raw = summary["hash"]
+    res.top_keys = ", ".join(summary["top_keys"][:10]) or "—"
+    res.load_ok = True
+    res.detail = "ok (streamed)"
+    res.size_hint = summary["size_hint"]
+    res.snapshot = summary["preview"]
+
+
+def _apply_links_doc(res: LinksResult, doc: dict, raw_text: str | None, detail: str) -> None:
+    res.hash_raw = _content_hash(raw_text)
+    res.top_keys = ", ".join(list(doc.keys())[:10]) or "—"
+    unwrapped, changed, _ = unwrap_links_json_cached(doc, res.hash_raw)
+    res.load_ok = True
+    res.detail = detail
+    res.doc_type = type(unwrapped).__name__
+    if not changed:
+        res.size_hint = _size_hint(doc)
+        res.snapshot = _preview_json(doc, raw_text)
+        return
+    if isinstance(unwrapped, dict):
+        res.size_hint = _size_hint(unwrapped)
+    elif isinstance(unwrapped, list):
+        res.size_hint = len(unwrapped)
+    else:
+        res.size_hint = 0  # wrapper held a scalar, e.g. {"data": "5"}
+    if res.size_hint > _BOUNDED_PREVIEW_MIN_ITEMS:
+        # big doc: hash + preview from a lazy encode, never the whole string
+        res.hash_decoded, res.snapshot = _hash_and_preview(unwrapped)
+    else:
+        # same (stdlib) encoder as _hash_and_preview, so the tag doesn't change across the threshold
+        preview_text = _PRETTY_ENCODER.encode(unwrapped)
+        res.hash_decoded = _content_hash(preview_text)
+        res.snapshot = _preview_json(unwrapped, preview_text)
+
+
+def _try_stream_summary(path: str) -> dict | None:
     try:
-        text = raw_text if raw_text else json.dumps(doc, ensure_ascii=False, indent=2)
+        return _stream_local_summary(path)
     except Exception:
-        text = json.dumps(doc, ensure_ascii=False)
-    return _preview_text(text, max_chars)
+        return None
+
+
+async def _resolve_links(st: dict) -> LinksResult:
+    """Work out which linked_players source /showexternals reports on, and load it."""
+    prefer_external = bool(st.get("prefer_external_links", True))
+    disable_local = bool(st.get("disable_local_link", False))
+    external_path = (st.get("external_links_path") or "").strip()
+    base = (st.get("external_data_base") or "").strip().rstrip("/")
+    if not external_path and base:
+        external_path = f"{base}/linked_players.json"
+
+    external_is_url = _is_url(external_path)
+    external_present = bool(external_path)
+    use_external_first = prefer_external or disable_local
+    chosen = "external" if (use_external_first and external_present) else ("local" if not disable_local else "none")
+    res = LinksResult(chosen, prefer_external, disable_local, base, external_path)
+
+    if chosen == "external" and external_present:
+        res.src_used = f"external:{external_path}"
+        summary = None if external_is_url else await asyncio.to_thread(_try_stream_summary, external_path)
+        if summary:
+            _apply_stream_summary(res, summary)
+        else:
+            try:
+                # raw_text is the on-the-wire / on-disk text; never re-dumped.
+                if external_is_url:
+                    data, raw_text = await _read_http_json_and_text(external_path)
+                else:
+                    ok, det, doc, raw = await asyncio.to_thread(_try_local_json_and_text, external_path)
+                    if not ok or not isinstance(doc, dict):
+                        raise ValueError(det or "failed to read local external path")
+                    data, raw_text = doc, raw or _dumps(doc, indent=False)
+
+                if not isinstance(data, dict):
+                    raise ValueError("top-level JSON is not an object")
+                _apply_links_doc(res, data, raw_text, "ok")
+            except (aiohttp.ClientError, TimeoutError, ValueError, json.JSONDecodeError) as e:
+                res.detail = f"external load failed: {e}"
+
+    if not res.load_ok and not disable_local:
+        candidates = []
+        if external_present and not external_is_url:
+            candidates.append(external_path)
+        candidates.extend(["settings/linked_players.json", "data/linked_players.json"])
+        for path in candidates:
+            summary = await asyncio.to_thread(_try_stream_summary, path)
+            if summary:
+                res.src_used = f"local:{path}"
+                _apply_stream_summary(res, summary)
+                break
+            ok, det, doc, raw = await asyncio.to_thread(_try_local_json_and_text, path)
+            if ok and isinstance(doc, dict):
+                res.src_used = f"local:{path}"
+                _apply_links_doc(res, doc, raw or _dumps(doc, indent=False), det)
+                break
+        if not res.load_ok and not res.detail:
+            res.detail = "no usable local file found"
+    return res
+
+
+async def _resolve_wallet(st: dict) -> WalletResult:
+    """Find the first readable wallet.json among the configured candidates."""
+    explicit = (st.get("external_wallet_path") or "").strip()
+    base = (st.get("external_data_base") or "").strip().rstrip("/")
+    candidates: list[str] = []
+    if explicit:
+        candidates.append(explicit)
+    if base:
+        candidates.append(f"{base}/wallet.json")
+    candidates += ["data/wallet.json", "wallet.json"]
+    res = WalletResult(explicit, candidates)
+
+    errors: list[str] = []
+    for p in candidates:
+        if _is_url(p):
+            try:
+                d, r = await _read_http_json_and_text(p)
+            except (aiohttp.ClientError, TimeoutError, ValueError) as e:
+                errors.append(f"{p}: {type(e).__name__}: {e}")
+                continue
+            if isinstance(d, dict):
+                res.chosen, res.raw = p, r
+                break
+            errors.append(f"{p}: not a JSON object")
+        else:
+            ok, det, d, r = await asyncio.to_thread(_try_local_json_and_text, p)
+            if ok and isinstance(d, dict):
+                res.chosen, res.raw = p, (r or _dumps(d, indent=False))
+                break
+            errors.append(f"{p}: {det}")
+    res.note = "\n".join(errors)
+    return res
 
 
 # ============================================================================
@@ -159,6 +551,15 @@ class AdminLinks(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
+    async def cog_load(self):
+        _get_http_session()
+
+    async def cog_unload(self):
+        global _http_session
+        if _http_session is not None and not _http_session.closed:
+            await _http_session.close()
+        _http_session = None
+
     # ---- NEW: combined SET command for externals -----------------------------
 
     set = app_commands.Group(name="set", description="Configure bot settings")
@@ -167,7 +568,7 @@ class AdminLinks(commands.Cog):
         name="externals",
         description="Set base/links/wallet/writer paths. Leave fields empty to keep current; use '-' to clear."
     )
-    @admin_check()
+    @admin_check
     @app_commands.describe(
         base="Base folder (e.g. https://.../data) that contains wallet.json & linked_players.json",
         links="Explicit path/URL to linked_players.json (overrides base)",
@@ -203,38 +604,22 @@ class AdminLinks(commands.Cog):
         changed: list[str] = []
         kept: list[str] = []
 
-        upd, val = _norm(base, strip_trailing_slash=True)
-        if upd:
-            updates["external_data_base"] = val
-            changed.append(f"external_data_base → `{val or 'cleared'}`")
-        else:
-            kept.append("external_data_base")
-
-        upd, val = _norm(links)
-        if upd:
-            updates["external_links_path"] = val
-            changed.append(f"external_links_path → `{val or 'cleared'}`")
-        else:
-            kept.append("external_links_path")
-
-        upd, val = _norm(wallet)
-        if upd:
-            updates["external_wallet_path"] = val
-            changed.append(f"external_wallet_path → `{val or 'cleared'}`")
-        else:
-            kept.append("external_wallet_path")
-
-        upd, val = _norm(writer)
-        if upd:
-            updates["external_links_write_path"] = val
-            changed.append(f"external_links_write_path → `{val or 'cleared'}`")
-        else:
-            kept.append("external_links_write_path")
-
-        if updates:
-            save_settings(gid, updates)
-
-        st = load_settings(gid) or {}
+        # (input value, settings key, strip trailing slash)
+        specs = (
+            (base, "external_data_base", True),
+            (links, "external_links_path", False),
+            (wallet, "external_wallet_path", False),
+            (writer, "external_links_write_path", False),
+        )
+        for raw, key, strip in specs:
+            upd, val = _norm(raw, strip_trailing_slash=strip)
+            if upd:
+                updates[key] = val
+                changed.append(f"{key} → `{val or 'cleared'}`")
+            else:
+                kept.append(key)
+
+        st = save_settings(gid, updates) if updates else (load_settings(gid) or {})
         base_now = (st.get("external_data_base") or "—")
         links_now = (st.get("external_links_path") or "—")
         wallet_now = (st.get("external_wallet_path") or "—")
@@ -265,7 +650,7 @@ class AdminLinks(commands.Cog):
         name="settings",
         description="Set or view external-link preferences (prefer external; disable local /link)."
     )
-    @admin_check()
+    @admin_check
     @app_commands.describe(
         prefer_external="Prefer external linked_players over local (true/false)",
         disable_local="Disable this bot's local /link (use external only) (true/false)"
@@ -288,8 +673,7 @@ class AdminLinks(commands.Cog):
             updates["disable_local_link"] = bool(disable_local)
 
         if updates:
-            save_settings(gid, updates)
-            st = load_settings(gid) or {}
+            st = save_settings(gid, updates)
             current_prefer = bool(st.get("prefer_external_links", True))
             current_disable = bool(st.get("disable_local_link", False))
 
@@ -309,170 +693,61 @@ class AdminLinks(commands.Cog):
         name="showexternals",
         description="Show which linked_players and wallet sources are used, with previews and hashes."
     )
-    @admin_check()
+    @admin_check
     async def showexternals(self, interaction: discord.Interaction):
         gid = interaction.guild_id
         st = load_settings(gid) or {}
 
-        # ---------- LINKS (linked_players.json) ----------
-        prefer_external = bool(st.get("prefer_external_links", True))
-        disable_local = bool(st.get("disable_local_link", False))
-        external_path = (st.get("external_links_path") or "").strip()
-        base = (st.get("external_data_base") or "").strip().rstrip("/")
-        if not external_path and base:
-            external_path = f"{base}/linked_players.json"
-
-        external_is_url = external_path.lower().startswith(("http://", "https://"))
-        external_present = bool(external_path)
-        use_external_first = prefer_external or disable_local
-        chosen_links = "external" if (use_external_first and external_present) else ("local" if not disable_local else "none")
-
-        links_src_used = "none"
-        links_load_ok = False
-        links_detail = ""
-        links_top_keys = "—"
-        links_size_hint = 0
-        links_hash_raw = "n/a"
-        links_hash_decoded = None
-        links_snapshot = None
-        decoded_text = None
-
-        links_doc = None
-        raw_text = None
-
-        if chosen_links == "external" and external_present:
-            links_src_used = f"external:{external_path}"
-            try:
-                data = load_file(external_path)
-                if isinstance(data, dict):
-                    raw_text = json.dumps(data, ensure_ascii=False, indent=2)
-                elif isinstance(data, str):
-                    data = json.loads(data)
-                    raw_text = json.dumps(data, ensure_ascii=False, indent=2)
-                else:
-                    if external_is_url:
-                        data, raw_text = _read_http_json_and_text(external_path)
-                    else:
-                        ok, det, doc, raw = _try_local_json_and_text(external_path)
-                        if not ok or not isinstance(doc, dict):
-                            raise ValueError(det or "failed to read local external path")
-                        data, raw_text = doc, raw or json.dumps(doc, ensure_ascii=False)
-
-                if not isinstance(data, dict):
-                    raise ValueError("top-level JSON is not an object")
-
-                links_hash_raw = _content_hash(raw_text)
-                links_top_keys = ", ".join(list(data.keys())[:10]) or "—"
-
-                unwrapped, changed, _ = unwrap_links_json(data)
-                if changed:
-                    decoded_text = json.dumps(unwrapped, ensure_ascii=False, indent=2)
-                    links_hash_decoded = _content_hash(decoded_text)
-                    data = unwrapped
-
-                links_doc = data
-                links_load_ok = True
-                links_size_hint = _size_hint(links_doc)
-                links_snapshot = _preview_json(links_doc, decoded_text or raw_text)
-                links_detail = "ok"
-            except (HTTPError, URLError, TimeoutError, ValueError, json.JSONDecodeError) as e:
-                links_detail = f"external load failed: {e}"
-
-        if not links_load_ok and not disable_local:
-            candidates = []
-            if external_present and not external_is_url:
-                candidates.append(external_path)
-            candidates.extend(["settings/linked_players.json", "data/linked_players.json"])
-            for path in candidates:
-                ok, det, doc, raw = _try_local_json_and_text(path)
-                if ok and isinstance(doc, dict):
-                    links_src_used = f"local:{path}"
-                    links_hash_raw = _content_hash(raw or json.dumps(doc, ensure_ascii=False))
-                    links_top_keys = ", ".join(list(doc.keys())[:10]) or "—"
-                    unwrapped, changed, _ = unwrap_links_json(doc)
-                    if changed:
-                        decoded_text = json.dumps(unwrapped, ensure_ascii=False, indent=2)
-                        links_hash_decoded = _content_hash(decoded_text)
-                        doc = unwrapped
-                    links_doc = doc
-                    links_load_ok = True
-                    links_detail = det
-                    links_size_hint = _size_hint(doc)
-                    links_snapshot = _preview_json(doc, decoded_text or raw)
-                    break
-            if not links_load_ok and not links_detail:
-                links_detail = "no usable local file found"
+        # Links and wallet resolve independently (either may hit the network).
+        lr, wr = await asyncio.gather(_resolve_links(st), _resolve_wallet(st))
+
+        desc_lines = [
+            f"**Chosen source**: `{lr.chosen}`",
+            f"**prefer_external_links**: {lr.prefer_external} • **disable_local_link**: {lr.disable_local}",
+            f"**external_data_base**: {lr.base or '—'}",
+            f"**external_links_path**: {lr.external_path or '—'}",
+            f"**Resolved source used**: {lr.src_used}",
+            f"**Load result**: {'✅ ok' if lr.load_ok else f'❌ {lr.detail}'}",
+        ]
+        if lr.load_ok:
+            desc_lines.append(f"**Top-level keys (raw)**: {lr.top_keys or '—'}")
+            desc_lines.append(f"**Content hash (raw)**: {lr.hash_raw or 'n/a'}")
+            if lr.hash_decoded:
+                desc_lines.append(f"**Content hash (decoded from 'data')**: {lr.hash_decoded}")
 
         links_embed = discord.Embed(
             title="linked_players status",
-            color=0x3BA55C if links_load_ok else 0xED4245,
-            description=f"**Chosen source**: `{chosen_links}`",
+            color=0x3BA55C if lr.load_ok else 0xED4245,
+            description="\n".join(desc_lines),
         )
-        links_embed.add_field(name="prefer_external_links", value=str(prefer_external))
-        links_embed.add_field(name="disable_local_link", value=str(disable_local))
-        links_embed.add_field(name="external_data_base", value=(base or "—"), inline=False)
-        links_embed.add_field(name="external_links_path", value=(external_path or "—"), inline=False)
-        links_embed.add_field(name="Resolved source used", value=links_src_used, inline=False)
-        links_embed.add_field(name="Load result", value=("✅ ok" if links_load_ok else f"❌ {links_detail}"), inline=False)
-
-        if links_load_ok and isinstance(links_doc, dict):
-            links_embed.add_field(name="Top-level keys (raw)", value=links_top_keys or "—", inline=False)
-            links_embed.add_field(name="Content hash (raw)", value=links_hash_raw or "n/a", inline=True)
-            if links_hash_decoded:
-                links_embed.add_field(name="Content hash (decoded from 'data')", value=links_hash_decoded, inline=True)
-            links_embed.add_field(name="Snapshot (first ~900 chars)", value=f"```json\n{links_snapshot}\n```", inline=False)
-            links_embed.set_footer(text=f"size_hint={links_size_hint} • type={type(links_doc).__name__}")
-
-        # ---------- WALLET (wallet.json) ----------
-        explicit_wallet = (st.get("external_wallet_path") or "").strip()
-        wallet_candidates: list[str] = []
-        if explicit_wallet:
-            wallet_candidates.append(explicit_wallet)
-        if base:
-            wallet_candidates.append(f"{base}/wallet.json")
-        wallet_candidates += ["data/wallet.json", "wallet.json"]
-
-        wallet_chosen = None
-        wallet_doc = None
-        wallet_raw = None
-        wallet_note = ""
-
-        for p in wallet_candidates:
-            try:
-                if p.lower().startswith(("http://", "https://")):
-                    d, r = _read_http_json_and_text(p)
-                    if isinstance(d, dict):
-                        wallet_chosen, wallet_doc, wallet_raw = p, d, r
-                        break
-                else:
-                    ok, det, d, r = _try_local_json_and_text(p)
-                    if ok and isinstance(d, dict):
-                        wallet_chosen, wallet_doc, wallet_raw = p, d, (r or json.dumps(d, ensure_ascii=False))
-                        break
-                    else:
-                        wallet_note = det or wallet_note
-            except Exception as e:
-                wallet_note = f"{type(e).__name__}: {e}"
+        if lr.load_ok:
+            links_embed.add_field(name="Snapshot (first ~900 chars)", value=f"```json\n{lr.snapshot}\n```", inline=False)
+            links_embed.set_footer(text=f"size_hint={lr.size_hint} • type={lr.doc_type}")
+
+        wallet_lines = [
+            f"**external_data_base**: {lr.base or '—'}",
+            f"**external_wallet_path**: {wr.explicit or '—'}",
+        ]
+        if wr.chosen:
+            wallet_lines.append(f"**Resolved source used**: {wr.chosen}")
+            wallet_lines.append(f"**Content hash**: {_content_hash(wr.raw)}")
+        elif wr.note:
+            wallet_lines.append(f"**Notes**:\n{wr.note}")
 
         wallet_embed = discord.Embed(
-            title="wallet.json status" if wallet_chosen else "wallet.json status — not found",
-            color=0x3BA55C if wallet_chosen else 0xED4245
+            title="wallet.json status" if wr.chosen else "wallet.json status — not found",
+            color=0x3BA55C if wr.chosen else 0xED4245,
+            description="\n".join(wallet_lines),
         )
-        wallet_embed.add_field(name="external_data_base", value=(base or "—"), inline=False)
-        wallet_embed.add_field(name="external_wallet_path", value=(explicit_wallet or "—"), inline=False)
-        if wallet_chosen:
-            wallet_embed.add_field(name="Resolved source used", value=wallet_chosen, inline=False)
-            wallet_embed.add_field(name="Content hash", value=_content_hash(wallet_raw), inline=False)
-            snippet = (wallet_raw[:900] + ("…" if len(wallet_raw) > 900 else ""))
+        if wr.chosen:
+            snippet = (wr.raw[:900] + ("…" if len(wr.raw) > 900 else ""))
             wallet_embed.add_field(name="Snapshot (first ~900 chars)", value=f"```json\n{snippet}\n```", inline=False)
         else:
             wallet_embed.add_field(
                 name="Search attempted",
-                value="```\n" + "\n".join(wallet_candidates) + "\n```",
+                value="```\n" + "\n".join(wr.candidates) + "\n```",
                 inline=False
             )
-            if wallet_note:
-                wallet_embed.add_field(name="Note", value=wallet_note, inline=False)
 
         await interaction.response.send_message(embeds=[links_embed, wallet_embed], ephemeral=True)
 
@@ -4,25 +4,20 @@ from discord import app_commands
 from discord.ext import commands
 from utils.settings import load_settings
 from tracer.config import MAPS
-
-def admin_check():
-    def pred(i: discord.Interaction):
-        perms = getattr(i.user, "guild_permissions", None)
-        return bool(perms and (perms.administrator or perms.manage_guild))
-    return app_commands.check(lambda i: pred(i))
+from utils.admin import admin_check
 
 class AdminMisc(commands.Cog):
     def __init__(self, bot):
         self.bot = bot
 
     @app_commands.command(name="sync", description="Force sync slash commands (admin only)")
-    @admin_check()
+    @admin_check
     async def sync(self, interaction: discord.Interaction):
         cmds = await interaction.client.tree.sync()
         await interaction.response.send_message(f"✅ Synced {len(cmds)} command(s).", ephemeral=True)
 
     @app_commands.command(name="settings_here", description="Show settings for this guild")
-    @admin_check()
+    @admin_check
     async def settings_here(self, interaction: discord.Interaction):
         gid = interaction.guild_id
         s = load_settings(gid)
@@ -5,7 +5,7 @@ from discord.ext import commands
 from utils.linking import (
     link_locally,
     resolve_from_any,
-    load_external_links,
+    get_external_links,
     load_local_links,
 )
 from utils.settings import load_settings  # NEW
@@ -30,7 +30,7 @@ class LinkCog(commands.Cog):
             )
 
         # If external has a different tag for this user, show it (FYI), but we still link locally (per guild).
-        ext = load_external_links(guild_id) or {}
+        ext = get_external_links(guild_id)
         prior_ext = None
         rec = ext.get(user_id)
         if isinstance(rec, dict):
@@ -1,6 +1,9 @@
 from __future__ import annotations
 
+import asyncio
+import functools
 import io
+import json
 from pathlib import Path
 from datetime import datetime, timezone
 from typing import List, Dict, Any, Tuple
@@ -10,7 +13,8 @@ from discord import app_commands
 from discord.ext import commands
 
 from utils.settings import load_settings
-from PIL import Image, ImageDraw, ImageFont  # Pillow
+from utils.admin import admin_check
+from PIL import Image, ImageDraw, ImageFont, features  # Pillow
 
 # Optional import from tracker (safe fallback if not present during reloads)
 try:
@@ -20,13 +24,6 @@ except Exception:  # pragma: no cover
         return []
 
 
-def admin_check():
-    def pred(i: discord.Interaction):
-        perms = getattr(i.user, "guild_permissions", None)
-        return bool(perms and (perms.administrator or perms.manage_guild))
-    return app_commands.check(lambda i: pred(i))
-
-
 # ----------------------- tiny logger -----------------------
 def _now():
     return datetime.utcnow().strftime("%Y-%m-%d %H:%M:%S UTC")
@@ -36,7 +33,6 @@ def _log(gid: int, msg: str, extra: Dict[str, Any] | None = None):
     base = f"[{_now()}] [showtracked] [guild {gid}] {msg}"
     if extra:
         try:
-            import json
             print(base, json.dumps(extra, default=str, ensure_ascii=False))
             return
         except Exception:
@@ -78,12 +74,32 @@ MAP_PATHS = {
 }
 
 
+# Filter for the one-off background resize (cached afterwards; pins are drawn on top,
+# so BILINEAR's softer edges don't show and it's cheaper than BICUBIC).
+MAP_RESAMPLE = getattr(getattr(Image, "Resampling", Image), "BILINEAR")
+
+
+def _try_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
+    try:
+        return ImageFont.truetype("arial.ttf", size)
+    except Exception:
+        return ImageFont.load_default()
+
+
+# Parsed once per process instead of re-reading the TTF on every render
+_FONT_TITLE = _try_font(24)
+_FONT_LABEL = _try_font(22)
+
+
+# Snapshot rows repeat a handful of map strings; memoize the strip/casefold/lookup.
+@functools.lru_cache(maxsize=64)
 def _canon_map_name(s: str | None) -> str:
     s = (s or "Livonia").strip()
     return CANON_MAP.get(s.casefold(), "Livonia")
 
 
 # Strong path resolution (handles different working dirs / case sensitive FS)
+@functools.lru_cache(maxsize=16)
 def _resolve_asset(rel_path: str) -> Path | None:
     """
     Try several locations to find the asset on disk:
@@ -128,18 +144,31 @@ def _world_size_for(map_name: str) -> int:
     return WORLD_SIZE.get(_canon_map_name(map_name), 15360)
 
 
+# (asset path, size_px) -> padded + resized RGBA background; callers get a copy.
+_MAP_IMAGE_CACHE: Dict[Tuple[str, int], Image.Image] = {}
+
+
 def _load_map_image(gid: int, map_name: str, size_px: int = 1400) -> Image.Image:
     """
     Try loading a map background; fall back to blank grid if missing.
     Returns an RGBA image (square) so we can draw anti-aliased labels.
+    Decoded backgrounds are cached per process, so only the first call per map pays for it.
     """
     canon = _canon_map_name(map_name)
     rel = MAP_PATHS.get(canon)
     if rel:
         abs_path = _resolve_asset(rel)
         if abs_path:
+            cached = _MAP_IMAGE_CACHE.get((str(abs_path), size_px))
+            if cached is not None:
+                return cached.copy()
             try:
-                img = Image.open(abs_path).convert("RGBA")
+                img = Image.open(abs_path)
+                # JPEGs can decode straight at a 1/2..1/8 scale that still covers size_px
+                # (no-op for PNGs or when upscaling).
+                img.draft("RGB", (size_px, size_px))
+                if img.mode != "RGBA":
+                    img = img.convert("RGBA")
                 if img.width != img.height:
                     side = max(img.width, img.height)
                     canvas = Image.new("RGBA", (side, side), (18, 18, 22, 255))
@@ -148,7 +177,10 @@ def _load_map_image(gid: int, map_name: str, size_px: int = 1400) -> Image.Image
                     canvas.paste(img, (ox, oy))
                     img = canvas
                 _log(gid, "map image loaded", {"map": canon, "path": str(abs_path)})
-                return img.resize((size_px, size_px), Image.BICUBIC)
+                if img.size != (size_px, size_px):
+                    img = img.resize((size_px, size_px), MAP_RESAMPLE)
+                _MAP_IMAGE_CACHE[(str(abs_path), size_px)] = img
+                return img.copy()
             except Exception as e:
                 _log(gid, "map open failed; using fallback",
                      {"map": canon, "path": str(abs_path), "error": repr(e)})
@@ -157,7 +189,12 @@ def _load_map_image(gid: int, map_name: str, size_px: int = 1400) -> Image.Image
                  {"expected_dir": "/app/assets/maps", "rel": rel, "map": canon})
 
     # Fallback: plain dark background with grid
-    side = size_px
+    return _fallback_map_image(canon, size_px).copy()
+
+
+@functools.lru_cache(maxsize=8)
+def _fallback_map_image(canon: str, side: int) -> Image.Image:
+    """Grid placeholder for a map with no art; drawn once per (map, size), callers copy it."""
     img = Image.new("RGBA", (side, side), (18, 18, 22, 255))
     drw = ImageDraw.Draw(img)
     # draw a simple 10x10 grid
@@ -165,42 +202,156 @@ def _load_map_image(gid: int, map_name: str, size_px: int = 1400) -> Image.Image
     for k in range(0, side + 1, step):
         drw.line([(k, 0), (k, side)], fill=(40, 40, 46, 255), width=1)
         drw.line([(0, k), (side, k)], fill=(40, 40, 46, 255), width=1)
-    title = f"{_canon_map_name(map_name)} (fallback)"
-    try:
-        font = ImageFont.truetype("arial.ttf", 24)
-    except Exception:
-        font = ImageFont.load_default()
-    drw.text((12, 12), title, fill=(200, 200, 200, 255), font=font)
+    title = f"{canon} (fallback)"
+    drw.text((12, 12), title, fill=(200, 200, 200, 255), font=_FONT_TITLE)
     return img
 
 
-def _world_to_image(x: float, z: float, world_size: int, img_size: int) -> Tuple[int, int]:
+def _f(v: Any) -> float:
+    """float(v), or 0.0 for missing/unparseable values; numbers skip the try frame."""
+    t = type(v)
+    if t is float:
+        return v
+    if t is int:
+        return float(v)
+    if not v:
+        return 0.0
+    try:
+        return float(v)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def _row_xz(row: Dict[str, Any]) -> Tuple[float, float]:
+    return _f(row.get("x")), _f(row.get("z"))
+
+
+def _world_to_image_batch(coords: List[Tuple[float, float]], world_size: int, img_size: int) -> List[Tuple[int, int]]:
     """
-    Convert DayZ world coords (x, z) -> image pixels.
+    Convert DayZ world coords [(x, z), ...] -> image pixels in one pass.
     (0,0) world is bottom-left; image (0,0) is top-left,
     so we flip the vertical axis.
     """
-    try:
-        px = max(0, min(img_size - 1, int(round((x / world_size) * img_size))))
-        py = max(0, min(img_size - 1, int(round(((world_size - z) / world_size) * img_size))))
-        return px, py
-    except Exception:
-        return 0, 0
+    scale = img_size / world_size
+    hi = img_size - 1
+    out: List[Tuple[int, int]] = []
+    for x, z in coords:
+        try:
+            px = max(0, min(hi, round(x * scale)))
+            py = max(0, min(hi, round((world_size - z) * scale)))
+        except (ValueError, OverflowError):  # nan / inf
+            px, py = 0, 0
+        out.append((px, py))
+    return out
+
+
+_PIN_R = 9
+
+
+def _make_pin_sprite() -> Image.Image:
+    side = 2 * _PIN_R + 1
+    img = Image.new("RGBA", (side, side), (0, 0, 0, 0))
+    drw = ImageDraw.Draw(img)
+    c = _PIN_R
+    drw.ellipse([0, 0, side - 1, side - 1], fill=(255, 72, 72, 255), outline=(0, 0, 0, 255), width=2)
+    drw.ellipse([c - 2, c - 2, c + 2, c + 2], fill=(0, 0, 0, 255))
+    return img
+
+
+# Rasterized once; each pin is a single paste instead of two ellipse draws.
+_PIN_SPRITE = _make_pin_sprite()
 
 
-def _draw_pin(drw: ImageDraw.ImageDraw, p: Tuple[int, int]):
+def _draw_pin(base: Image.Image, p: Tuple[int, int]):
     x, y = p
-    r = 9
-    drw.ellipse([x - r, y - r, x + r, y + r], fill=(255, 72, 72, 255), outline=(0, 0, 0, 255), width=2)
-    drw.ellipse([x - 2, y - 2, x + 2, y + 2], fill=(0, 0, 0, 255))
+    # paste (unlike alpha_composite) clips sprites that hang off the edge
+    base.paste(_PIN_SPRITE, (x - _PIN_R, y - _PIN_R), _PIN_SPRITE)
 # -----------------------------------------------------------
 
 
-def _izurvive_url(map_name: str, x: float, z: float) -> str:
-    canon = _canon_map_name(map_name)
-    slug = MAP_SLUG.get(canon, "livonia")
+def _izurvive_url_fmt(map_name: str) -> str:
+    """URL template for a map; fill with .format(x, z). Build once per list, not per row."""
+    slug = MAP_SLUG.get(_canon_map_name(map_name), "livonia")
     # iZurvive likes decimals with a semicolon delimiter
-    return f"https://www.izurvive.com/{slug}/#location={x:.2f};{z:.2f}"
+    return f"https://www.izurvive.com/{slug}/#location={{:.2f}};{{:.2f}}"
+
+
+def _izurvive_url(map_name: str, x: float, z: float) -> str:
+    return _izurvive_url_fmt(map_name).format(x, z)
+
+
+def _fmt_when(ts: Any) -> str:
+    try:
+        if ts and getattr(ts, "tzinfo", None):
+            return ts.astimezone(timezone.utc).strftime("%H:%M:%S UTC")
+    except Exception:
+        pass
+    return ""
+
+
+# WebP at method=0 encodes several times faster than default PNG and is ~10x smaller
+# for these maps; builds of Pillow without libwebp fall back to a fast-deflate PNG.
+_HAS_WEBP = features.check("webp")
+
+
+def _encode_map(img: Image.Image) -> Tuple[io.BytesIO, str]:
+    buf = io.BytesIO()
+    if _HAS_WEBP:
+        img.convert("RGB").save(buf, format="WEBP", quality=85, method=0)
+        name = "tracked_map.webp"
+    else:
+        img.save(buf, format="PNG", compress_level=1)
+        name = "tracked_map.png"
+    buf.seek(0)
+    return buf, name
+
+
+def _render_tracked(gid: int, active_map: str, world_size: int,
+                    rows: List[Dict[str, Any]]) -> Tuple[io.BytesIO, str, List[str]]:
+    """
+    Draw pins + labels on the map, encode it, and build the text lines.
+    Pure CPU work (decode/draw/encode), so the command runs it in a worker thread.
+    """
+    # Create image (with reliable asset loading)
+    base = _load_map_image(gid, active_map, size_px=1400)  # RGBA
+    drw = ImageDraw.Draw(base)
+    W, _H = base.size
+
+    # Font — larger + stroke for readability
+    font = _FONT_LABEL
+
+    # Coerce coords once and project them in one pass
+    coords = [_row_xz(r) for r in rows]
+    pixels = _world_to_image_batch(coords, world_size, W)
+
+    # One pass: draw each pin + label and compose its clickable iZurvive line
+    url_fmt = _izurvive_url_fmt(active_map)
+    pins = []
+    lines = []
+    for r, (x, z), (px, py) in zip(rows, coords, pixels):
+        name = str(r.get("name") or r.get("short_id") or "?")
+        _draw_pin(base, (px, py))
+        # crisp text with stroke (outline) so it reads over the map
+        drw.text(
+            (px + 12, py - 6),
+            name,
+            fill=(255, 255, 255, 255),
+            font=font,
+            stroke_width=2,
+            stroke_fill=(0, 0, 0, 255),
+        )
+        if len(pins) < 5:
+            pins.append({"name": name, "x": x, "z": z, "px": px, "py": py})
+        lines.append(
+            f"• **{name}** ({r.get('short_id') or ''}) — "
+            f"[({x:.1f}, {z:.1f})]({url_fmt.format(x, z)}) {_fmt_when(r.get('ts'))}"
+        )
+
+    _log(gid, "pins drawn", {"count": len(lines), "pins_sample": pins})
+
+    # Save image buffer once (used only on page 1)
+    buf, filename = _encode_map(base)
+    return buf, filename, lines
 
 
 # ---------- pagination helpers (prevents 2,000-char crashes) ----------
@@ -213,16 +364,22 @@ def _chunk_lines_for_embed(header: str, lines: List[str]) -> List[str]:
     each <= EMBED_DESC_LIMIT (including header on first page).
     """
     pages: List[str] = []
-    cur = header.strip()
+    head = header.strip()
+    # Track the page as parts + a running length; join only when a page is emitted.
+    parts = [head]
+    cur_len = len(head)
     for ln in lines:
-        add = ("\n" if cur else "") + ln
-        if len(cur) + len(add) > EMBED_DESC_LIMIT:
-            pages.append(cur)
-            cur = ln  # start next page without header
+        n = len(ln)
+        if not cur_len:
+            parts, cur_len = [ln], n
+        elif cur_len + 1 + n > EMBED_DESC_LIMIT:
+            pages.append("\n".join(parts))
+            parts, cur_len = [ln], n  # start next page without header
         else:
-            cur += add
-    if cur:
-        pages.append(cur)
+            parts.append(ln)
+            cur_len += 1 + n
+    if cur_len:
+        pages.append("\n".join(parts))
     return pages
 # ----------------------------------------------------------------------
 
@@ -235,7 +392,7 @@ class ShowTracked(commands.Cog):
         name="tracked",
         description="Show last-known locations for all currently tracked players (list + map image).",
     )
-    @admin_check()
+    @admin_check
     async def show_tracked(self, interaction: discord.Interaction):
         gid = interaction.guild_id or 0
         st = load_settings(gid) or {}
@@ -289,11 +446,7 @@ class ShowTracked(commands.Cog):
         })
 
         # Filter to current map if items include map info
-        def _same_map(row: Dict[str, Any]) -> bool:
-            m = _canon_map_name((row.get("map") or active_map))
-            return m == active_map
-
-        rows = [r for r in raw_rows if _same_map(r)]
+        rows = [r for r in raw_rows if _canon_map_name(r.get("map") or active_map) == active_map]
         post_count = len(rows)
         _log(gid, "after map filter", {"kept": post_count, "dropped": pre_count - post_count})
 
@@ -311,60 +464,8 @@ class ShowTracked(commands.Cog):
         # Sort by name for stable output
         rows.sort(key=lambda r: (str(r.get("name") or r.get("short_id")), r.get("short_id", "")))
 
-        # Create image (with reliable asset loading)
-        base = _load_map_image(gid, active_map, size_px=1400)  # RGBA
-        drw = ImageDraw.Draw(base)
-        W, _H = base.size
-
-        # Font — larger + stroke for readability
-        try:
-            font = ImageFont.truetype("arial.ttf", 22)
-        except Exception:
-            font = ImageFont.load_default()
-
-        # Draw each pin + label
-        pins = []
-        for r in rows:
-            try:
-                x = float(r.get("x") or 0.0)
-                z = float(r.get("z") or 0.0)
-            except Exception:
-                x, z = 0.0, 0.0
-            name = str(r.get("name") or r.get("short_id") or "?")
-            px, py = _world_to_image(x, z, world_size, W)
-            _draw_pin(drw, (px, py))
-            # crisp text with stroke (outline) so it reads over the map
-            drw.text(
-                (px + 12, py - 6),
-                name,
-                fill=(255, 255, 255, 255),
-                font=font,
-                stroke_width=2,
-                stroke_fill=(0, 0, 0, 255),
-            )
-            pins.append({"name": name, "x": x, "z": z, "px": px, "py": py})
-
-        _log(gid, "pins drawn", {"count": len(pins), "pins_sample": pins[:5]})
-
-        # Compose text list with clickable iZurvive links
-        lines = []
-        for r in rows:
-            name = str(r.get("name") or r.get("short_id") or "?")
-            short_id = str(r.get("short_id") or "")
-            try:
-                x = float(r.get("x") or 0.0)
-                z = float(r.get("z") or 0.0)
-            except Exception:
-                x, z = 0.0, 0.0
-            ts = r.get("ts")
-            when = ""
-            try:
-                if ts and getattr(ts, "tzinfo", None):
-                    when = ts.astimezone(timezone.utc).strftime("%H:%M:%S UTC")
-            except Exception:
-                pass
-            url = _izurvive_url(active_map, x, z)
-            lines.append(f"• **{name}** ({short_id}) — [({x:.1f}, {z:.1f})]({url}) {when}")
+        # Render + encode off the event loop so heartbeats and other commands keep flowing
+        buf, filename, lines = await asyncio.to_thread(_render_tracked, gid, active_map, world_size, rows)
 
         header = f"**Tracked players — {active_map}**"
         if relaxed_used:
@@ -374,15 +475,11 @@ class ShowTracked(commands.Cog):
         pages = _chunk_lines_for_embed(header, lines)
         total_pages = len(pages)
 
-        # Save image buffer once (used only on page 1)
-        buf = io.BytesIO()
-        base.save(buf, format="PNG")
-        buf.seek(0)
-        file = discord.File(buf, filename="tracked_map.png")
+        file = discord.File(buf, filename=filename)
 
         # Send first page with the map image
         embed0 = discord.Embed(description=pages[0], color=0x2f3136)
-        embed0.set_image(url="attachment://tracked_map.png")
+        embed0.set_image(url=f"attachment://{filename}")
         if total_pages > 1:
             embed0.set_footer(text=f"Page 1/{total_pages}")
         await interaction.followup.send(embed=embed0, file=file, ephemeral=False)
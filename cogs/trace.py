@@ -1,8 +1,12 @@
 # cogs/trace.py
 from __future__ import annotations
 
+import asyncio
+import functools
+import hashlib
 import io
 import re
+import time
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
 from typing import Any, Dict, List, Tuple, Optional
@@ -11,7 +15,7 @@ from itertools import product
 import discord
 from discord import app_commands
 from discord.ext import commands
-from PIL import Image, ImageDraw, ImageFont  # Pillow
+from PIL import Image, ImageDraw, ImageFont, features  # Pillow
 
 from utils.settings import load_settings
 from utils.linking import resolve_from_any
@@ -72,6 +76,7 @@ MAP_PATHS = {
 }
 
 
+@functools.lru_cache(maxsize=16)
 def _resolve_asset(rel_path: str) -> Path | None:
     """
     Try several locations and extensions to find an asset on disk.
@@ -122,8 +127,9 @@ def _resolve_asset(rel_path: str) -> Path | None:
     return None
 
 
-def _active_map_name(guild_id: int | None) -> str:
-    s = load_settings(guild_id) if guild_id else {}
+def _active_map_name(guild_id: int | None, settings: Dict[str, Any] | None = None) -> str:
+    """Active map for the guild; pass already-loaded settings to skip another lookup."""
+    s = settings if settings is not None else (load_settings(guild_id) if guild_id else {})
     return (s.get("active_map") or "Livonia").strip()
 
 
@@ -136,26 +142,60 @@ def _world_size_for(map_name: str) -> int:
     return WORLD_SIZE.get(map_name.lower(), 15360)
 
 
-def _world_to_image(x: float, z: float, world_size: int, img_size: int) -> Tuple[int, int]:
+def _world_to_image_batch(coords: List[Tuple[float, float]], world_size: int, img_size: int) -> List[Tuple[int, int]]:
     """
     DayZ world: (0,0) bottom-left. Image: (0,0) top-left. Flip Z axis.
+    Converts [(x, z), ...] in one pass with the scale/bounds hoisted.
     """
+    scale = img_size / world_size
+    hi = img_size - 1
+    out: List[Tuple[int, int]] = []
+    for x, z in coords:
+        try:
+            px = max(0, min(hi, round(x * scale)))
+            py = max(0, min(hi, round((world_size - z) * scale)))
+        except (ValueError, OverflowError):  # nan / inf
+            px, py = 0, 0
+        out.append((px, py))
+    return out
+
+
+def _try_font(size: int) -> ImageFont.FreeTypeFont | ImageFont.ImageFont:
     try:
-        px = max(0, min(img_size - 1, int(round((x / world_size) * img_size))))
-        py = max(0, min(img_size - 1, int(round(((world_size - z) / world_size) * img_size))))
-        return px, py
+        return ImageFont.truetype("arial.ttf", size)
     except Exception:
-        return 0, 0
+        return ImageFont.load_default()
+
+
+# Parsed once per process instead of re-reading the TTF on every render
+_FONT_TITLE = _try_font(24)
+_FONT_LABEL = _try_font(22)
+
+# Filter for the one-off background resize (cached afterwards; the path and pins are
+# drawn on top, so BILINEAR's softer edges don't show and it's cheaper than BICUBIC).
+MAP_RESAMPLE = getattr(getattr(Image, "Resampling", Image), "BILINEAR")
+
+# (asset path, size_px) -> padded + resized RGBA background; callers get a copy.
+_MAP_IMAGE_CACHE: Dict[Tuple[str, int], Image.Image] = {}
 
 
 def _load_map_image(gid: int | None, map_name: str, size_px: int = 1200) -> Image.Image:
+    """Map background as a fresh RGBA copy; the decoded art is cached per process."""
     rel = MAP_PATHS.get(map_name.lower())
     _log(gid, "resolve map asset", {"map": map_name, "rel": rel})
     if rel:
         abs_path = _resolve_asset(rel)
         if abs_path:
+            cached = _MAP_IMAGE_CACHE.get((str(abs_path), size_px))
+            if cached is not None:
+                return cached.copy()
             try:
-                img = Image.open(abs_path).convert("RGBA")
+                img = Image.open(abs_path)
+                # JPEGs can decode straight at a 1/2..1/8 scale that still covers size_px
+                # (no-op for PNGs or when upscaling).
+                img.draft("RGB", (size_px, size_px))
+                if img.mode != "RGBA":
+                    img = img.convert("RGBA")
                 if img.width != img.height:
                     side = max(img.width, img.height)
                     canvas = Image.new("RGBA", (side, side), (18, 18, 22, 255))
@@ -164,33 +204,48 @@ def _load_map_image(gid: int | None, map_name: str, size_px: int = 1200) -> Imag
                     canvas.paste(img, (ox, oy))
                     img = canvas
                 _log(gid, "map image loaded", {"map": map_name, "path": str(abs_path)})
-                RESAMPLE = getattr(getattr(Image, "Resampling", Image), "BICUBIC")
-                return img.resize((size_px, size_px), RESAMPLE)
+                if img.size != (size_px, size_px):
+                    img = img.resize((size_px, size_px), MAP_RESAMPLE)
+                _MAP_IMAGE_CACHE[(str(abs_path), size_px)] = img
+                return img.copy()
             except Exception as e:
                 _log(gid, "map open failed; using fallback", {"map": map_name, "path": str(abs_path), "error": repr(e)})
         else:
             _log(gid, "map file not found; using fallback", {"expected": rel})
 
     # Fallback grid
-    side = size_px
+    return _fallback_grid(size_px, map_name).copy()
+
+
+@functools.lru_cache(maxsize=4)
+def _fallback_grid(side: int, map_name: str) -> Image.Image:
+    """Grid placeholder for a map with no art; drawn once per (size, map), callers copy it."""
     img = Image.new("RGBA", (side, side), (18, 18, 22, 255))
     drw = ImageDraw.Draw(img)
     step = side // 10
     for k in range(0, side + 1, step):
         drw.line([(k, 0), (k, side)], fill=(40, 40, 46, 255), width=1)
         drw.line([(0, k), (side, k)], fill=(40, 40, 46, 255), width=1)
-    try:
-        font = ImageFont.truetype("arial.ttf", 24)
-    except Exception:
-        font = ImageFont.load_default()
-    drw.text((12, 12), f"{map_name} (fallback)", fill=(200, 200, 200, 255), font=font)
+    drw.text((12, 12), f"{map_name} (fallback)", fill=(200, 200, 200, 255), font=_FONT_TITLE)
+    return img
+
+
+@functools.lru_cache(maxsize=16)
+def _pin_sprite(color: Tuple[int, int, int, int], r: int) -> Image.Image:
+    """Pin rasterized once per (color, radius); stamped with a single paste per point."""
+    side = 2 * r + 1
+    img = Image.new("RGBA", (side, side), (0, 0, 0, 0))
+    drw = ImageDraw.Draw(img)
+    drw.ellipse([0, 0, side - 1, side - 1], fill=color, outline=(0, 0, 0, 255), width=2)
+    drw.ellipse([r - 2, r - 2, r + 2, r + 2], fill=(0, 0, 0, 255))
     return img
 
 
-def _draw_pin(drw: ImageDraw.ImageDraw, p: Tuple[int, int], color: Tuple[int, int, int, int], r: int = 8):
+def _draw_pin(base: Image.Image, p: Tuple[int, int], color: Tuple[int, int, int, int], r: int = 8):
     x, y = p
-    drw.ellipse([x - r, y - r, x + r, y + r], fill=color, outline=(0, 0, 0, 255), width=2)
-    drw.ellipse([x - 2, y - 2, x + 2, y + 2], fill=(0, 0, 0, 255))
+    sprite = _pin_sprite(color, r)
+    # paste (unlike alpha_composite) clips sprites that hang off the edge
+    base.paste(sprite, (x - r, y - r), sprite)
 
 
 def _draw_diamond(drw: ImageDraw.ImageDraw, p: Tuple[int, int], color: Tuple[int, int, int, int], r: int = 7):
@@ -248,6 +303,20 @@ def _extract_time(utc_date: datetime, line: str) -> Optional[datetime]:
     hh, mm, ss = m.group(1).split(":")
     return utc_date.replace(hour=int(hh), minute=int(mm), second=int(ss), microsecond=0)
 
+def _hms(ts_raw: Any) -> str:
+    """
+    "HH:MM:SS" in UTC for a datetime or ISO string, "" when missing/unparseable.
+    Fallback actions carry datetimes, tracker docs carry ISO strings.
+    """
+    if not ts_raw:
+        return ""
+    try:
+        ts = ts_raw if isinstance(ts_raw, datetime) else \
+            datetime.fromisoformat(str(ts_raw).replace("Z", "+00:00"))
+        return ts.astimezone(timezone.utc).strftime("%H:%M:%S")
+    except Exception:
+        return ""
+
 def _extract_coords(line: str) -> Tuple[Optional[float], Optional[float]]:
     m = _POS_RE.search(line)
     if not m:
@@ -257,6 +326,27 @@ def _extract_coords(line: str) -> Tuple[Optional[float], Optional[float]]:
     except Exception:
         return None, None
 
+# Enough for the scanner's 25k-line window at typical ADM line lengths
+_ADM_TAIL_BYTES = 4 * 1024 * 1024
+
+def _tail_text(path: Path, limit: int = _ADM_TAIL_BYTES) -> str:
+    """
+    Decode the last ~limit bytes of a text file, starting at a line boundary,
+    with newlines normalized like read_text() does.
+    """
+    with path.open("rb") as f:
+        size = f.seek(0, 2)
+        start = max(0, size - limit)
+        f.seek(start)
+        data = f.read()
+    if start:
+        nl = data.find(b"\n")
+        data = data[nl + 1:] if nl >= 0 else b""
+    text = data.decode("utf-8", "ignore")
+    if "\r" in text:
+        text = text.replace("\r\n", "\n").replace("\r", "\n")
+    return text
+
 def _read_text_candidates(gid: int | None, guild_settings: dict) -> str:
     """Read ADM mirror. Prefer per-guild mirror, then global."""
     paths: List[str] = []
@@ -273,8 +363,18 @@ def _read_text_candidates(gid: int | None, guild_settings: dict) -> str:
         if p not in paths:
             paths.append(p)
 
-    # Try storageClient first, then local disk
+    # Try local disk first (tail only), then storageClient
     for p in paths:
+        # local disk
+        try:
+            fp = Path(p)
+            if fp.exists() and fp.is_file():
+                text = _tail_text(fp)
+                _log(gid, "ADM source chosen (local)", {"path": p, "bytes": len(text)})
+                return text
+        except Exception as e:
+            _log(gid, "local read failed", {"path": p, "error": repr(e)})
+
         # storageClient
         if load_file is not None:
             try:
@@ -286,19 +386,35 @@ def _read_text_candidates(gid: int | None, guild_settings: dict) -> str:
             except Exception as e:
                 _log(gid, "storageClient load failed", {"path": p, "error": repr(e)})
 
-        # local disk
-        try:
-            fp = Path(p)
-            if fp.exists() and fp.is_file():
-                text = fp.read_text(encoding="utf-8", errors="ignore")
-                _log(gid, "ADM source chosen (local)", {"path": p, "bytes": len(text)})
-                return text
-        except Exception as e:
-            _log(gid, "local read failed", {"path": p, "error": repr(e)})
-
     _log(gid, "no ADM text available for fallback scan", None)
     return ""
 
+def _tail_offset(txt: str, max_lines: int) -> int:
+    """Offset where the last max_lines lines of txt start (0 if it has fewer)."""
+    if txt.count("\n") < max_lines:
+        return 0
+    pos = len(txt) - 1 if txt.endswith("\n") else len(txt)
+    for _ in range(max_lines):
+        pos = txt.rfind("\n", 0, pos)
+        if pos < 0:
+            return 0
+    return pos + 1
+
+def _matching_lines(txt: str, start: int, pat: re.Pattern) -> List[str]:
+    """Whole lines of txt[start:] that contain a match of pat (each line once)."""
+    out: List[str] = []
+    pos = start
+    while True:
+        m = pat.search(txt, pos)
+        if not m:
+            return out
+        ls = txt.rfind("\n", 0, m.start()) + 1
+        le = txt.find("\n", m.end())
+        if le < 0:
+            le = len(txt)
+        out.append(txt[ls:le])
+        pos = le + 1
+
 def _fallback_load_actions(
     gid: int | None,
     gamertag: str,
@@ -313,8 +429,8 @@ def _fallback_load_actions(
     Accepts quoted/unquoted names and is resilient to formatting differences.
 
     Strategy:
-      1) Try time-filtered scan.
-      2) If empty, do a second scan *without* time filtering and return the most recent matches.
+      1) Keep the matches inside the time window (or without a parsable time).
+      2) If none, fall back to the most recent matches regardless of time.
     """
     txt = _read_text_candidates(gid, guild_settings)
     if not txt:
@@ -323,7 +439,8 @@ def _fallback_load_actions(
 
     esc = re.escape(gamertag)
     # Match: Player "Name" ..., Player Name ..., "Name" ..., Name ...
-    name_pat = re.compile(rf'(?i)(?:\bplayer\s+)?(?:"{esc}"|{esc})\b')
+    # (an optional "Player " prefix can't change whether a line matches, so it's left out)
+    name_pat = re.compile(rf'(?i)(?:"{esc}"|{esc})\b')
 
     now = datetime.now(timezone.utc)
     if start and end:
@@ -335,42 +452,29 @@ def _fallback_load_actions(
 
     date_for_ts = now.astimezone(timezone.utc)
 
-    def scan_lines(apply_time_filter: bool) -> List[Dict[str, Any]]:
-        actions: List[Dict[str, Any]] = []
-        lines = txt.splitlines()
-        if len(lines) > max_lines:
-            lines = lines[-max_lines:]  # keep the most recent tail
-
-        for ln in lines:
-            if not name_pat.search(ln):
-                continue
-
-            ts = _extract_time(date_for_ts, ln)
-            if apply_time_filter and ts is not None:
-                if not (win_start <= ts <= win_end):
-                    continue
-
-            kind = _classify(ln)
-            x, z = _extract_coords(ln)
-            actions.append({
-                "ts": ts.isoformat() if ts else None,
-                "type": kind,
-                "desc": ln.split("|", 1)[-1].strip(),
-                "x": x,
-                "z": z,
-                "raw": ln.strip(),  # keep the verbatim line
-            })
-        return actions
-
-    # Pass 1: time filtered
-    actions = scan_lines(apply_time_filter=True)
-
-    # Pass 2: if nothing matched (timestamp parsing/formatting quirks), try without time filter
-    if not actions:
-        actions = scan_lines(apply_time_filter=False)
-        # keep only the most recent 400 matches to avoid giant files
-        if len(actions) > 400:
-            actions = actions[-400:]
+    # Let the regex engine find the player's lines across the whole tail instead of
+    # splitting 25k lines and searching each one.
+    lines = _matching_lines(txt, _tail_offset(txt, max_lines), name_pat)
+
+    # Single pass: parse each match's time once, then pick the window (or the fallback)
+    timed = [(_extract_time(date_for_ts, ln), ln) for ln in lines]
+    chosen = [(ts, ln) for ts, ln in timed if ts is None or win_start <= ts <= win_end]
+    if not chosen:
+        # nothing in-window (timestamp parsing/formatting quirks): use the most recent
+        # 400 matches regardless of time to avoid giant files
+        chosen = timed[-400:]
+
+    actions: List[Dict[str, Any]] = []
+    for ts, ln in chosen:
+        x, z = _extract_coords(ln)
+        actions.append({
+            "ts": ts,  # datetime or None; formatted only where it's shown
+            "type": _classify(ln),
+            "desc": ln.split("|", 1)[-1].strip(),
+            "x": x,
+            "z": z,
+            "raw": ln.strip(),  # keep the verbatim line
+        })
 
     _log(gid, "fallback actions parsed", {"count": len(actions)})
     return actions
@@ -439,38 +543,94 @@ def _add_lines_with_budget(embed: discord.Embed, title_prefix: str, lines: List[
 # -------------------------------------------------------------------
 
 
+_HAS_WEBP = features.check("webp")
+
+
+def _trace_image_format(settings: Dict[str, Any] | None) -> str:
+    """Per-guild "trace_image_format" ("png" default, or "webp" when Pillow supports it)."""
+    fmt = str((settings or {}).get("trace_image_format") or "png").lower()
+    return "webp" if fmt == "webp" and _HAS_WEBP else "png"
+
+
+# Short-lived cache of encoded renders: admins often re-run /trace with the same
+# args seconds apart, and the image depends only on the inputs keyed below.
+_RENDER_TTL_SEC = 60
+_RENDER_CACHE_MAX = 32
+_RENDER_CACHE: Dict[str, Tuple[float, bytes]] = {}
+
+
+def _render_key(
+    guild_id: int | None,
+    map_name: str,
+    image_format: str,
+    doc: Dict[str, Any],
+    actions: List[Dict[str, Any]],
+) -> str:
+    pts = doc.get("points") or []
+    first = pts[0] if pts else {}
+    last = pts[-1] if pts else {}
+    last_a = actions[-1] if actions else {}
+    raw = "|".join(str(v) for v in (
+        guild_id, map_name, image_format, doc.get("gamertag"),
+        len(pts), first.get("ts"), last.get("ts"), last.get("x"), last.get("z"),
+        len(actions), last_a.get("raw") or last_a.get("ts"),
+    ))
+    return hashlib.blake2b(raw.encode("utf-8"), digest_size=16).hexdigest()
+
+
+def _cached_render(key: str) -> io.BytesIO | None:
+    hit = _RENDER_CACHE.get(key)
+    if hit is None:
+        return None
+    stamp, data = hit
+    if time.monotonic() - stamp >= _RENDER_TTL_SEC:
+        _RENDER_CACHE.pop(key, None)
+        return None
+    return io.BytesIO(data)
+
+
+def _store_render(key: str, buf: io.BytesIO) -> None:
+    _RENDER_CACHE.pop(key, None)
+    _RENDER_CACHE[key] = (time.monotonic(), buf.getvalue())
+    while len(_RENDER_CACHE) > _RENDER_CACHE_MAX:
+        _RENDER_CACHE.pop(next(iter(_RENDER_CACHE)))  # oldest insert
+
+
 def _render_trace_png(
     doc: Dict[str, Any],
     guild_id: int | None,
-    actions: Optional[List[Dict[str, Any]]] = None
+    actions: Optional[List[Dict[str, Any]]] = None,
+    map_name: str | None = None,
+    image_format: str = "png",
 ) -> io.BytesIO:
     """
     Draws path and overlays action diamonds.
+    image_format is "png" (fast deflate) or "webp"; see _trace_image_format.
     """
-    map_name = _active_map_name(guild_id)
+    map_name = map_name or _active_map_name(guild_id)
     world_size = _world_size_for(map_name)
     base = _load_map_image(guild_id, map_name, size_px=1200)  # square RGBA
     drw = ImageDraw.Draw(base)
 
-    try:
-        font = ImageFont.truetype("arial.ttf", 22)
-    except Exception:
-        font = ImageFont.load_default()
+    font = _FONT_LABEL
 
     pts = doc.get("points", []) or []
-    pix: List[Tuple[int, int]] = []
-    last_xz: Tuple[float, float] | None = None
     W, _ = base.size
 
+    # Collect valid coords (dropping consecutive near-duplicates), then project in one pass
+    xz: List[Tuple[float, float]] = []
+    last_r: Tuple[float, float] | None = None
     for p in pts:
         try:
             x, z = float(p.get("x")), float(p.get("z"))
         except Exception:
             continue
-        if last_xz and (round(x, 1), round(z, 1)) == (round(last_xz[0], 1), round(last_xz[1], 1)):
+        r = (round(x, 1), round(z, 1))
+        if r == last_r:
             continue
-        pix.append(_world_to_image(x, z, world_size, W))
-        last_xz = (x, z)
+        xz.append((x, z))
+        last_r = r
+    pix = _world_to_image_batch(xz, world_size, W)
 
     if len(pix) >= 2:
         try:
@@ -480,11 +640,11 @@ def _render_trace_png(
         drw.line(pix, fill=(255, 90, 90, 255), width=3)
 
     if pix:
-        _draw_pin(drw, pix[0], (82, 200, 120, 255), r=9)     # start
+        _draw_pin(base, pix[0], (82, 200, 120, 255), r=9)     # start
         for p in pix[1:-1]:
-            _draw_pin(drw, p, (238, 210, 2, 255), r=7)      # middles
+            _draw_pin(base, p, (238, 210, 2, 255), r=7)      # middles
         if len(pix) > 1:
-            _draw_pin(drw, pix[-1], (255, 72, 72, 255), r=9)  # end
+            _draw_pin(base, pix[-1], (255, 72, 72, 255), r=9)  # end
             name = str(doc.get("gamertag") or "player")
             ex, ey = pix[-1]
             drw.text(
@@ -497,19 +657,24 @@ def _render_trace_png(
             )
 
     if actions:
+        a_xz: List[Tuple[float, float]] = []
+        a_colors: List[Tuple[int, int, int, int]] = []
         for a in actions:
             try:
                 x, z = float(a.get("x")), float(a.get("z"))
             except Exception:
                 continue
-            if x is None or z is None:
-                continue
-            px, py = _world_to_image(x, z, world_size, W)
-            color = _action_color(str(a.get("type") or a.get("kind") or "event"))
-            _draw_diamond(drw, (px, py), color, r=6)
+            a_xz.append((x, z))
+            a_colors.append(_action_color(str(a.get("type") or a.get("kind") or "event")))
+        for p, color in zip(_world_to_image_batch(a_xz, world_size, W), a_colors):
+            _draw_diamond(drw, p, color, r=6)
 
     buf = io.BytesIO()
-    base.save(buf, format="PNG")
+    if image_format == "webp":
+        base.convert("RGB").save(buf, format="WEBP", quality=85, method=0)
+    else:
+        # zlib level 1: several times faster than the default 6 for a modest size bump
+        base.save(buf, format="PNG", compress_level=1)
     buf.seek(0)
     return buf
 # -----------------------------------------------------------------------------
@@ -624,7 +789,9 @@ class TraceCog(commands.Cog):
 
         # Fallback to direct ADM scan if none found
         if not actions:
-            actions = _fallback_load_actions(
+            # multi-MB regex scan: keep it off the event loop
+            actions = await asyncio.to_thread(
+                _fallback_load_actions,
                 gid=gid,
                 gamertag=player_name,
                 start=None,
@@ -634,8 +801,19 @@ class TraceCog(commands.Cog):
             )
 
         # ------------------- render image --------------------
+        map_name = _active_map_name(gid, st)
+        img_fmt = _trace_image_format(st)
+        render_key = _render_key(gid, map_name, img_fmt, doc, actions)
         try:
-            img_buf = _render_trace_png(doc, guild_id=gid, actions=actions)
+            img_buf = _cached_render(render_key)
+            if img_buf is None:
+                img_buf = await asyncio.to_thread(
+                    _render_trace_png, doc, guild_id=gid, actions=actions, map_name=map_name,
+                    image_format=img_fmt,
+                )
+                _store_render(render_key, img_buf)
+            else:
+                _log(gid, "render cache hit", {"key": render_key})
         except Exception as e:
             _log(gid, "internal renderer failed", {"error": repr(e)})
             return await interaction.followup.send(
@@ -643,7 +821,7 @@ class TraceCog(commands.Cog):
                 ephemeral=True
             )
 
-        map_file = discord.File(img_buf, filename=f"trace_{player_name}.png")
+        map_file = discord.File(img_buf, filename=f"trace_{player_name}.{img_fmt}")
 
         # ------- caption and link to last point ---------------
         last = points[-1]
@@ -652,17 +830,11 @@ class TraceCog(commands.Cog):
         except Exception:
             lx, lz = 0.0, 0.0
 
-        map_name = _active_map_name(gid)
         izu_last = _izurvive_url(map_name, lx, lz)
 
-        when_last = ""
-        try:
-            ts_raw = last.get("ts")
-            if ts_raw:
-                when_last = datetime.fromisoformat(str(ts_raw).replace("Z", "+00:00")) \
-                    .astimezone(timezone.utc).strftime("%H:%M:%S UTC")
-        except Exception:
-            pass
+        when_last = _hms(last.get("ts"))
+        if when_last:
+            when_last += " UTC"
 
         count = len(points)
         caption = (
@@ -685,14 +857,9 @@ class TraceCog(commands.Cog):
             except Exception:
                 x, z = 0.0, 0.0
             tag = "🟢 start" if idx == 1 else ("🔴 end" if idx == n else "🟡")
-            ts_s = ""
-            try:
-                ts_raw = p.get("ts")
-                if ts_raw:
-                    ts_s = datetime.fromisoformat(str(ts_raw).replace("Z", "+00:00")) \
-                        .astimezone(timezone.utc).strftime("%H:%M:%S UTC")
-            except Exception:
-                pass
+            ts_s = _hms(p.get("ts"))
+            if ts_s:
+                ts_s += " UTC"
             url = _izurvive_url(map_name, x, z)
             point_lines.append(f"{idx}. [{x:.1f}, {z:.1f}]({url}) — {tag} {ts_s}")
         if show_points < n:
@@ -705,15 +872,7 @@ class TraceCog(commands.Cog):
         if actions:
             # Prefer verbatim ADM lines
             for a in actions:
-                tss = ""
-                try:
-                    ts_raw = a.get("ts")
-                    if ts_raw:
-                        tss = datetime.fromisoformat(str(ts_raw).replace("Z", "+00:00")) \
-                              .astimezone(timezone.utc).strftime("%H:%M:%S UTC")
-                except Exception:
-                    pass
-                hhmmss = tss.split(" ")[0] if tss else "--:--:--"
+                hhmmss = _hms(a.get("ts")) or "--:--:--"
                 raw = str(a.get("raw") or "").strip()
                 if raw:
                     snapshot_lines.append(f"{hhmmss} | {raw}")
@@ -732,20 +891,12 @@ class TraceCog(commands.Cog):
         # If still nothing actionable, fall back to POS list
         if not snapshot_lines:
             for p in points:
-                tss = ""
-                try:
-                    ts_raw = p.get("ts")
-                    if ts_raw:
-                        tss = datetime.fromisoformat(str(ts_raw).replace("Z", "+00:00")) \
-                            .astimezone(timezone.utc).strftime("%H:%M:%S UTC")
-                except Exception:
-                    pass
+                hhmmss = _hms(p.get("ts")) or "--:--:--"
                 try:
                     x, z = float(p.get("x", 0.0)), float(p.get("z", 0.0))
                     coord_txt = f" ({x:.1f},{z:.1f})"
                 except Exception:
                     coord_txt = ""
-                hhmmss = tss.split(" ")[0] if tss else "--:--:--"
                 snapshot_lines.append(f"{hhmmss} | {'POS':<12} | position update{coord_txt}")
 
         now_utc = datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S UTC")
@@ -1,7 +1,7 @@
 # tracer/adm_buffer.py
 import logging
 from collections import deque
-from typing import Deque
+from typing import Deque, Set
 
 logger = logging.getLogger(__name__)
 
@@ -11,16 +11,33 @@ class AdmBuffer:
     when FTP servers resend trailing chunks, or when offsets shift slightly.
     """
     def __init__(self, max_remember: int = 100):
-        self.last: Deque[str] = deque(maxlen=max_remember)
+        # Only 64-bit fingerprints (the str hash, computed once in C) are kept, not the
+        # lines themselves; `_seen` mirrors `last` for O(1) membership.
+        self.last: Deque[int] = deque(maxlen=max_remember)
+        self._seen: Set[int] = set()
 
     def accept(self, line: str) -> bool:
         line = line.rstrip("\r\n")
+        return self.accept_with_fp(line, hash(line))
+
+    def accept_with_fp(self, line: str, h: int) -> bool:
+        """
+        accept() for a line without its EOL, reusing a fingerprint the caller
+        already computed (the poller's de-dupe hash) instead of hashing again.
+        """
+        debug = logger.isEnabledFor(logging.DEBUG)
         if not line:
-            logger.debug("Rejected empty ADM line.")
+            if debug:
+                logger.debug("Rejected empty ADM line.")
             return False
-        if line in self.last:
-            logger.debug(f"Duplicate ADM line ignored: {line}")
+        if h in self._seen:
+            if debug:
+                logger.debug(f"Duplicate ADM line ignored: {line}")
             return False
-        self.last.append(line)
-        logger.debug(f"Accepted ADM line: {line}")
+        if len(self.last) == self.last.maxlen:
+            self._seen.discard(self.last[0])  # about to be evicted
+        self.last.append(h)
+        self._seen.add(h)
+        if debug:
+            logger.debug(f"Accepted ADM line: {line}")
         return True
@@ -1,13 +1,21 @@
 # tracer/adm_state.py
 import json
 import logging
+import threading
 from pathlib import Path
 from typing import Optional
 
+from utils.storageClient import atomic_write_bytes
+
 logger = logging.getLogger(__name__)
 
 STATE_PATH = "data/adm_state.json"
 
+# Whole-file state kept in memory after the first read; this module is the only writer.
+# Pollers for different guilds may update concurrently from worker threads.
+_state: Optional[dict] = None
+_lock = threading.Lock()
+
 def _load() -> dict:
     p = Path(STATE_PATH)
     if not p.exists():
@@ -20,28 +28,38 @@ def _load() -> dict:
         return {}
 
 def _save(obj: dict):
-    p = Path(STATE_PATH)
+    # fsync'd tmp + replace: the offsets must survive a crash or power loss intact
     try:
-        p.parent.mkdir(parents=True, exist_ok=True)
-        p.write_text(json.dumps(obj, indent=2), encoding="utf-8")
+        atomic_write_bytes(STATE_PATH, json.dumps(obj, separators=(",", ":")).encode("utf-8"))
         logger.debug(f"ADM state saved for {len(obj)} guild(s).")
     except Exception as e:
         logger.error(f"Failed to save ADM state file {STATE_PATH}: {e}", exc_info=True)
 
+def _data() -> dict:
+    global _state
+    if _state is None:
+        _state = _load()
+    return _state
+
 def get_guild_state(guild_id: int) -> dict:
-    data = _load()
-    state = data.get(str(guild_id), {})
+    with _lock:
+        state = dict(_data().get(str(guild_id), {}))
     logger.debug(f"Loaded ADM state for guild {guild_id}: {state}")
     return state
 
 def set_guild_state(guild_id: int, *, latest_file: Optional[str] = None, offset: Optional[int] = None):
-    data = _load()
-    g = data.get(str(guild_id), {})
-    if latest_file is not None:
-        g["latest_file"] = latest_file
-        logger.info(f"[Guild {guild_id}] ADM state updated latest_file={latest_file}")
-    if offset is not None:
-        g["offset"] = offset
-        logger.debug(f"[Guild {guild_id}] ADM state updated offset={offset}")
-    data[str(guild_id)] = g
-    _save(data)
+    with _lock:
+        data = _data()
+        g = data.setdefault(str(guild_id), {})
+        changed = False
+        if latest_file is not None and g.get("latest_file") != latest_file:
+            g["latest_file"] = latest_file
+            changed = True
+            logger.info(f"[Guild {guild_id}] ADM state updated latest_file={latest_file}")
+        if offset is not None and g.get("offset") != offset:
+            g["offset"] = offset
+            changed = True
+            logger.debug(f"[Guild {guild_id}] ADM state updated offset={offset}")
+        # Nothing moved (idle server): skip the rewrite entirely
+        if changed:
+            _save(data)
@@ -28,6 +28,14 @@ MAPS = {
     },
 }
 
+# Casefolded lookups for resolving user input (key or display name) in O(1),
+# plus a frozen (display name, key) list for slash-command choices.
+MAPS_BY_KEY_CF = {k.casefold(): k for k in MAPS}
+MAPS_BY_NAME_CF = {
+    str(cfg.get("name")).strip().casefold(): k for k, cfg in MAPS.items() if cfg.get("name")
+}
+MAP_CHOICES = tuple((str(cfg.get("name", k)), k) for k, cfg in MAPS.items())
+
 # tracer/config.py (append to DEFAULT_SETTINGS)
 DEFAULT_SETTINGS = {
     "bounty_channel_id": None,   # public bounties channel
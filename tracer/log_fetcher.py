@@ -1,18 +1,18 @@
 # tracer/log_fetcher.py
 import asyncio
-import io
+import functools
 import logging
 import os
 import re
+import time
 from collections import deque
-from hashlib import blake2b
+from concurrent.futures import ThreadPoolExecutor
 from ftplib import FTP, error_perm
 from datetime import datetime, timezone
 from typing import Callable, Awaitable, Optional, List, Tuple, Dict, Any
 
 import requests  # used only if Nitrado API keys are provided
 
-from utils.ftp_config import get_ftp_config
 from tracer.adm_state import get_guild_state, set_guild_state
 from tracer.adm_buffer import AdmBuffer
 
@@ -30,15 +30,19 @@ def _when() -> str:
 # --- HASH DE-DUPE (Radar-style) ---------------------------------------------
 MAX_SEEN_HASHES = 4000  # last few thousand lines
 
-def _line_fingerprint(s: str) -> int:
-    h = blake2b(s.rstrip().encode("utf-8", "ignore"), digest_size=8)
-    return int.from_bytes(h.digest(), "big")
+def _line_fingerprint(stripped: str) -> int:
+    # Built-in str hash: 64-bit, no encode, and the seen-set never leaves the process
+    # (it's salted per run, so don't persist these). Caller passes the rstripped line.
+    return hash(stripped)
 # -----------------------------------------------------------------------------
 
 
 # -------- Mirror (write accepted ADM lines to a local rolling file) ----------
 MIRROR_MAX_LINES = 8000
 MIRROR_PATH_DEFAULT = "data/latest_adm.log"
+# Debounce: rewrite the mirror once this many lines are pending, or after this long
+MIRROR_FLUSH_LINES = 64
+MIRROR_FLUSH_SEC = 30.0
 
 def _atomic_write_text(path: str, text: str) -> None:
     try:
@@ -50,6 +54,20 @@ def _atomic_write_text(path: str, text: str) -> None:
         f.write(text)
     os.replace(tmp, path)
 
+def _link_or_copy(src: str, dst: str, text: str) -> None:
+    """Point `dst` at the file just written to `src` (hardlink, atomic swap); else write `text`."""
+    tmp = f"{dst}.tmp"
+    try:
+        try:
+            os.remove(tmp)
+        except FileNotFoundError:
+            pass
+        os.link(src, tmp)
+        os.replace(tmp, dst)
+    except OSError:
+        # no hardlinks on this filesystem
+        _atomic_write_text(dst, text)
+
 def _load_tail_into_deque(path: str, dq: deque, max_lines: int) -> None:
     try:
         with open(path, "r", encoding="utf-8", errors="ignore") as f:
@@ -70,6 +88,14 @@ ADM_NAME_TS = re.compile(
     re.IGNORECASE,
 )
 
+# MLSD facts: "type=file;size=123;modify=20240101120000;"
+_MLSD_FACT_RX = re.compile(r"([^=;]+)=([^;]*)")
+
+def _is_adm(name: str) -> bool:
+    # only the 3-char extension gets lowercased, not the whole (long) file name
+    return len(name) >= 4 and name[-4] == "." and name[-3:].lower() == "adm"
+
+@functools.lru_cache(maxsize=1024)  # same few names every poll; datetimes are immutable
 def _parse_name_ts(name: str) -> Optional[datetime]:
     m = ADM_NAME_TS.search(name)
     if not m:
@@ -81,6 +107,15 @@ def _parse_name_ts(name: str) -> Optional[datetime]:
         return None
 
 
+def _fast_mdtm(mod: str) -> datetime:
+    """Fixed-width YYYYMMDDHHMMSS (MLSD modify / MDTM) → UTC datetime, without strptime."""
+    return datetime(
+        int(mod[0:4]), int(mod[4:6]), int(mod[6:8]),
+        int(mod[8:10]), int(mod[10:12]), int(mod[12:14]),
+        tzinfo=timezone.utc,
+    )
+
+
 def _ftp_mlsd_lines(ftp: FTP) -> list[str]:
     lines: list[str] = []
     ftp.retrlines("MLSD", lines.append)
@@ -98,13 +133,9 @@ def _ftp_latest_adm_with_mlsd(ftp: FTP, directory: str) -> Optional[str]:
                 continue
             facts_part, name = ln.split(" ", 1)
             name = name.strip()
-            if not name.lower().endswith(".adm"):
+            if not _is_adm(name):
                 continue
-            facts = {}
-            for kv in facts_part.split(";"):
-                if "=" in kv:
-                    k, v = kv.split("=", 1)
-                    facts[k.lower()] = v
+            facts = {k.lower(): v for k, v in _MLSD_FACT_RX.findall(facts_part)}
             if facts.get("type", "").lower() != "file":
                 continue
             modify = facts.get("modify")  # YYYYMMDDHHMMSS
@@ -149,7 +180,7 @@ def _ftp_list_via_LIST(ftp: FTP, directory: str) -> list[str]:
 
 
 def _pick_latest_by_name(names: list[str]) -> Optional[str]:
-    adms = [n for n in names if n.lower().endswith(".adm")]
+    adms = [n for n in names if _is_adm(n)]
     if not adms:
         return None
     parsed = [(n, _parse_name_ts(n)) for n in adms]
@@ -168,13 +199,46 @@ def _ensure_binary(ftp: FTP) -> None:
         pass
 
 
-def _ftp_read_range_in_cwd(ftp: FTP, filename: str, start: int) -> bytes:
+def _ftp_connect(cfg: Dict[str, Any]) -> FTP:
+    """Open + log in a session for `cfg` (passive, binary). CWD is left to the caller."""
+    ftp = FTP(cfg["host"], timeout=25)
+    try:
+        ftp.login(cfg["username"], cfg["password"])
+    except Exception:
+        ftp.close()
+        raise
+    try:
+        ftp.set_pasv(True)
+    except Exception:
+        pass
+    _ensure_binary(ftp)
+    return ftp
+
+
+def _ftp_alive(ftp: FTP) -> bool:
+    """Cheap liveness probe for a cached session (servers drop idle control sockets)."""
+    try:
+        ftp.voidcmd("NOOP")
+        return True
+    except Exception:
+        return False
+
+
+# Reuse a cycle's directory listing this long, but only while the active file
+# keeps growing (a stalled file may mean a new ADM appeared, so re-list then).
+LIST_CACHE_SEC = 60.0
+
+# RETR block size: ftplib's 8 KiB default means 8x the callbacks for a large catch-up read
+_RETR_BLKSIZE = 64 * 1024
+
+def _ftp_read_range_in_cwd(ftp: FTP, filename: str, start: int) -> bytearray:
     """
     Read bytes of `filename` in CURRENT dir from offset `start` to EOF.
     Ensures binary mode (TYPE I) so REST works on Nitrado.
     Retries once if the server rejects REST due to ASCII mode.
+    Chunks land straight in a bytearray (no BytesIO + getvalue() copy).
     """
-    bio = io.BytesIO()
+    buf = bytearray()
     _ensure_binary(ftp)
 
     if start > 0:
@@ -187,19 +251,19 @@ def _ftp_read_range_in_cwd(ftp: FTP, filename: str, start: int) -> bytes:
                     _ensure_binary(ftp)
                     ftp.sendcmd(f"REST {start}")
                 except Exception:
-                    return b""
+                    return buf
             else:
                 raise
 
-    ftp.retrbinary(f"RETR {filename}", bio.write)
-    return bio.getvalue()
+    ftp.retrbinary(f"RETR {filename}", buf.extend, blocksize=_RETR_BLKSIZE)
+    return buf
 
 
-def _ftp_read_all_in_cwd(ftp: FTP, filename: str) -> bytes:
-    bio = io.BytesIO()
+def _ftp_read_all_in_cwd(ftp: FTP, filename: str) -> bytearray:
+    buf = bytearray()
     _ensure_binary(ftp)
-    ftp.retrbinary(f"RETR {filename}", bio.write)
-    return bio.getvalue()
+    ftp.retrbinary(f"RETR {filename}", buf.extend, blocksize=_RETR_BLKSIZE)
+    return buf
 
 
 def _ftp_size(ftp: FTP, filename: str) -> Optional[int]:
@@ -228,14 +292,16 @@ def _ftp_mdtm(ftp: FTP, filename: str) -> Optional[str]:
 def _list_adm_files(ftp: FTP) -> List[Tuple[str, int, Optional[datetime]]]:
     """
     Return (name, size, mtime) for each *.ADM in the CWD.
-    We UNION the results of MLSD, NLST, and LIST to avoid transient omissions.
+    MLSD carries size + modify in one round-trip, so it's authoritative when it
+    lists any ADM. Only if it fails/comes back empty do we fall back to NLST,
+    then LIST (names only; size 0 since selection goes by mtime/name).
     """
     out: Dict[str, Tuple[str, int, Optional[datetime]]] = {}
 
     # MLSD pass
     try:
         for name, facts in list(ftp.mlsd()):
-            if not name.lower().endswith(".adm"):
+            if not _is_adm(name):
                 continue
             if facts.get("type", "").lower() != "file":
                 continue
@@ -244,7 +310,7 @@ def _list_adm_files(ftp: FTP) -> List[Tuple[str, int, Optional[datetime]]]:
             mod = facts.get("modify")
             if mod and len(mod) >= 14:
                 try:
-                    mtime = datetime.strptime(mod[:14], "%Y%m%d%H%M%S").replace(tzinfo=timezone.utc)
+                    mtime = _fast_mdtm(mod)
                 except Exception:
                     mtime = None
             if mtime is None:
@@ -252,22 +318,20 @@ def _list_adm_files(ftp: FTP) -> List[Tuple[str, int, Optional[datetime]]]:
             out[name] = (name, size, mtime)
     except Exception:
         pass
+    if out:
+        return list(out.values())
 
     # NLST pass
     try:
         names: List[str] = []
         ftp.retrlines("NLST", names.append)
         for n in names:
-            if not n.lower().endswith(".adm"):
-                continue
-            try:
-                size = ftp.size(n) or 0
-            except Exception:
-                size = 0
-            mt = out.get(n, (None, 0, None))[2] or _parse_name_ts(n)
-            out.setdefault(n, (n, size, mt))
+            if _is_adm(n):
+                out[n] = (n, 0, _parse_name_ts(n))
     except Exception:
         pass
+    if out:
+        return list(out.values())
 
     # LIST pass
     try:
@@ -275,17 +339,9 @@ def _list_adm_files(ftp: FTP) -> List[Tuple[str, int, Optional[datetime]]]:
         ftp.retrlines("LIST", raw.append)
         for ln in raw:
             parts = ln.split()
-            if not parts:
-                continue
-            n = parts[-1]
-            if not n.lower().endswith(".adm"):
-                continue
-            if n not in out:
-                try:
-                    size = ftp.size(n) or 0
-                except Exception:
-                    size = 0
-                out[n] = (n, size, _parse_name_ts(n))
+            if parts and _is_adm(parts[-1]):
+                n = parts[-1]
+                out[n] = (n, 0, _parse_name_ts(n))
     except Exception:
         pass
 
@@ -305,6 +361,10 @@ def _choose_latest_adm(files: List[Tuple[str, int, Optional[datetime]]]) -> Tupl
 
 
 # =================== Nitrado API discovery (optional) ===================
+# One pooled session: keep-alive + TLS reuse across polls (urllib3's pool is thread-safe).
+_HTTP = requests.Session()
+HTTP_TIMEOUT_SEC = 30
+
 def _nitrado_api_get_latest(cfg: Dict[str, Any]) -> Tuple[Optional[str], Optional[str], str]:
     """
     Returns (filename, download_url, diag_reason) for the newest ADM via Nitrado HTTP API.
@@ -328,11 +388,11 @@ def _nitrado_api_get_latest(cfg: Dict[str, Any]) -> Tuple[Optional[str], Optiona
     headers = {"Authorization": f"Bearer {token}", "Accept": "application/json"}
     try:
         list_url = f"https://api.nitrado.net/services/{service_id}/gameservers/file_server/list"
-        r = requests.get(list_url, headers=headers, params={"dir": dir_path}, timeout=10)
+        r = _HTTP.get(list_url, headers=headers, params={"dir": dir_path}, timeout=10)
         if r.status_code != 200:
             return (None, None, f"list HTTP {r.status_code}")
         entries = r.json().get("data", {}).get("entries", []) or []
-        adm = [e for e in entries if str(e.get("name","")).lower().endswith(".adm")]
+        adm = [e for e in entries if _is_adm(str(e.get("name","")))]
         if not adm:
             return (None, None, "no ADM entries")
         def _dt(e):
@@ -340,7 +400,7 @@ def _nitrado_api_get_latest(cfg: Dict[str, Any]) -> Tuple[Optional[str], Optiona
         latest = max(adm, key=_dt)
         fname = latest.get("name")
         down_url = f"https://api.nitrado.net/services/{service_id}/gameservers/file_server/download"
-        r2 = requests.get(down_url, headers=headers,
+        r2 = _HTTP.get(down_url, headers=headers,
                           params={"file": f"{dir_path.rstrip('/')}/{fname}"}, timeout=10)
         if r2.status_code != 200:
             return (None, None, f"download token HTTP {r2.status_code}")
@@ -353,308 +413,374 @@ def _nitrado_api_get_latest(cfg: Dict[str, Any]) -> Tuple[Optional[str], Optiona
 # =====================================================================
 
 
+# Blocking FTP/HTTP calls get their own pool: a guild stuck on a slow server then
+# can't starve the default executor that renders and disk reads use via to_thread.
+FTP_IO_WORKERS = max(4, int(os.getenv("FTP_IO_WORKERS") or 32))
+_FTP_POOL = ThreadPoolExecutor(max_workers=FTP_IO_WORKERS, thread_name_prefix="ftp-io")
+
 async def _to_thread(func, *args, **kwargs):
-    return await asyncio.to_thread(func, *args, **kwargs)
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_FTP_POOL, functools.partial(func, *args, **kwargs))
 
 
-async def poll_guild(guild_id: int, cb: LineCallback, stop_event: asyncio.Event):
+async def _raw_listings(ftp: FTP) -> Tuple[list[str], list[str]]:
+    """Raw NLST + LIST of the CWD, for diagnostics only (two extra round-trips)."""
+    try:
+        raw_nlst = await _to_thread(_ftp_list_names, ftp, ".")
+    except Exception:
+        raw_nlst = []
+    try:
+        raw_list = await _to_thread(_ftp_list_via_LIST, ftp, ".")
+    except Exception:
+        raw_list = []
+    return raw_nlst, raw_list
+
+
+class GuildPollState:
     """
-    Poll FTP for a single guild. Reads new bytes since last offset; if a newer
-    ADM file appears, automatically switches to it.
-
-    Improvements:
-    - Radar-style recent-hash de-dupe
-    - Bounded full-file fallback when REST fails (<= 512 KiB)
-    - Heartbeat diagnostics
-    - Unified FTP listing (MLSD ∪ NLST ∪ LIST) + candidate logging
-    - Nitrado API discovery of the newest ADM (active file) with HTTP fallback.
+    Everything a guild's poller carries from one cycle to the next: active
+    file + offset, Radar-style hash de-dupe, the rolling mirror tail, and the
+    FTP session (reused across cycles, reopened on the first failure).
+    Keeping it on an object lets a single scheduler drive every guild with
+    `poll_guild_once` instead of one long-lived task per guild.
     """
-    cfg = get_ftp_config(guild_id)
-    if not cfg:
-        logger.warning(f"[Guild {guild_id}] No FTP config set; skipping poller.")
-        return
-
-    interval = max(5, int(cfg.get("interval_sec", 10)))
-    directory = cfg.get("adm_dir", "/")
-
-    buffer = AdmBuffer(max_remember=200)
-    state = get_guild_state(guild_id)
-    latest_file = state.get("latest_file")
-    offset = int(state.get("offset") or 0)
-
-    seen_set: set[int] = set()
-    seen_queue: deque[int] = deque()
-
-    last_seen_line: Optional[str] = None
-    last_seen_hash: Optional[int] = None
-
-    # ---- local mirror (rolling tail of accepted lines) ----------------------
-    mirror_tail: deque[str] = deque(maxlen=MIRROR_MAX_LINES)
-    mirror_dirty = False
-    # prime from existing default mirror if present (best-effort)
-    _load_tail_into_deque(MIRROR_PATH_DEFAULT, mirror_tail, MIRROR_MAX_LINES)
-    # also prime from per-guild mirror if present (overrides / appends)
-    mirror_per_guild = f"data/latest_adm_{guild_id}.log"
-    _load_tail_into_deque(mirror_per_guild, mirror_tail, MIRROR_MAX_LINES)
-    # ------------------------------------------------------------------------
-
-    def _remember_line(line: str) -> bool:
-        nonlocal last_seen_line, last_seen_hash
-        fp = _line_fingerprint(line)
-        if fp in seen_set:
+    __slots__ = (
+        "guild_id", "cfg", "interval", "directory", "buffer", "latest_file", "offset",
+        "seen_set", "seen_queue", "last_seen_line", "last_seen_hash",
+        "mirror_tail", "mirror_pending", "mirror_written_at", "mirror_per_guild",
+        "ftp", "ftp_in_dir", "list_cache", "file_growing", "partial_end",
+    )
+
+    def __init__(self, guild_id: int, cfg: Dict[str, Any]):
+        self.guild_id = guild_id
+        self.cfg = cfg
+        self.interval = max(5, int(cfg.get("interval_sec", 10)))
+        self.directory = cfg.get("adm_dir", "/")
+
+        self.buffer = AdmBuffer(max_remember=200)
+        state = get_guild_state(guild_id)
+        self.latest_file: Optional[str] = state.get("latest_file")
+        self.offset = int(state.get("offset") or 0)
+
+        self.seen_set: set[int] = set()
+        self.seen_queue: deque[int] = deque()
+
+        self.last_seen_line: Optional[str] = None
+        self.last_seen_hash: Optional[int] = None
+
+        # Cached session; ftp_in_dir is set once CWD into `directory` succeeded.
+        self.ftp: Optional[FTP] = None
+        self.ftp_in_dir = False
+        # (monotonic ts, files, pwd) from the last full scan; see LIST_CACHE_SEC
+        self.list_cache: Optional[Tuple[float, List[Tuple[str, int, Optional[datetime]]], str]] = None
+        self.file_growing = False
+        # End of the data last cycle when it stopped mid-line (else None); see _poll_cycle
+        self.partial_end: Optional[int] = None
+
+        # ---- local mirror (rolling tail of accepted lines) ------------------
+        self.mirror_tail: deque[str] = deque(maxlen=MIRROR_MAX_LINES)
+        self.mirror_pending = 0  # accepted lines not on disk yet
+        self.mirror_written_at = time.monotonic()
+        # prime from existing default mirror if present (best-effort)
+        _load_tail_into_deque(MIRROR_PATH_DEFAULT, self.mirror_tail, MIRROR_MAX_LINES)
+        # also prime from per-guild mirror if present (overrides / appends)
+        self.mirror_per_guild = f"data/latest_adm_{guild_id}.log"
+        _load_tail_into_deque(self.mirror_per_guild, self.mirror_tail, MIRROR_MAX_LINES)
+        # --------------------------------------------------------------------
+
+    def remember_line(self, line: str) -> bool:
+        stripped = line.rstrip()
+        fp = _line_fingerprint(stripped)
+        if fp in self.seen_set:
             return False
-        seen_set.add(fp)
-        seen_queue.append(fp)
-        if len(seen_queue) > MAX_SEEN_HASHES:
-            old = seen_queue.popleft()
-            seen_set.discard(old)
-        last_seen_line = line.rstrip()
-        last_seen_hash = fp
+        self.seen_set.add(fp)
+        self.seen_queue.append(fp)
+        if len(self.seen_queue) > MAX_SEEN_HASHES:
+            old = self.seen_queue.popleft()
+            self.seen_set.discard(old)
+        self.last_seen_line = stripped
+        self.last_seen_hash = fp
         return True
 
-    logger.info(f"[Guild {guild_id}] Starting ADM poller (dir={directory}, every {interval}s).")
-
-    while not stop_event.is_set():
-        try:
-            ftp = await _to_thread(FTP, cfg["host"], timeout=25)
-            await _to_thread(ftp.login, cfg["username"], cfg["password"])
-            try:
-                await _to_thread(ftp.set_pasv, True)
-            except Exception:
-                pass
+    def close_ftp(self) -> None:
+        """Drop the cached FTP session; the next cycle reconnects."""
+        ftp, self.ftp, self.ftp_in_dir = self.ftp, None, False
+        self.list_cache = None
+        if ftp is not None:
             try:
-                await _to_thread(ftp.voidcmd, "TYPE I")
+                ftp.close()
             except Exception:
                 pass
 
-            # Enter the configured directory
-            try:
-                await _to_thread(ftp.cwd, directory)
-            except Exception as e:
-                try:
-                    pwd = await _to_thread(ftp.pwd)
-                except Exception:
-                    pwd = "(unknown)"
-                logger.error(f"[Guild {guild_id}] CWD to '{directory}' failed from PWD={pwd}: {e}", exc_info=True)
-                try:
-                    root_ls = await _to_thread(_ftp_list_names, ftp, "/")
-                    logger.info(f"[Guild {guild_id}] FTP root entries: {root_ls[:40]}")
-                except Exception:
-                    pass
-                await _to_thread(ftp.quit)
-                if last_seen_hash is not None:
-                    logger.info(f"[Guild {guild_id}] Last line hash #{last_seen_hash}: {last_seen_line[:160]}")
-                # attempt to keep mirror current even if no new data (no-op if not dirty)
-                if mirror_dirty:
-                    try:
-                        text = "\n".join(mirror_tail) + "\n"
-                        _atomic_write_text(MIRROR_PATH_DEFAULT, text)
-                        _atomic_write_text(mirror_per_guild, text)
-                        mirror_dirty = False
-                        logger.info(f"[Guild {guild_id}] Mirror written (no data branch).")
-                    except Exception as e2:
-                        logger.debug(f"[Guild {guild_id}] Mirror write failed: {e2}")
-                await asyncio.sleep(interval)
-                continue
-
-            # ===== unified directory scan (MLSD ∪ NLST ∪ LIST)
-            files = await _to_thread(_list_adm_files, ftp)
-            try:
-                pwd_now = await _to_thread(ftp.pwd)
-            except Exception:
-                pwd_now = "(unknown)"
-
-            try:
-                raw_nlst = await _to_thread(_ftp_list_names, ftp, ".")
-            except Exception:
-                raw_nlst = []
-            try:
-                raw_list = await _to_thread(_ftp_list_via_LIST, ftp, ".")
-            except Exception:
-                raw_list = []
+    def write_mirror(self, note: str = "", force: bool = False) -> None:
+        """
+        Write the mirror tail if there are pending lines (no-op otherwise).
+        Debounced to every MIRROR_FLUSH_LINES lines / MIRROR_FLUSH_SEC unless `force`.
+        """
+        if not self.mirror_pending:
+            return
+        now = time.monotonic()
+        if not force and self.mirror_pending < MIRROR_FLUSH_LINES \
+                and now - self.mirror_written_at < MIRROR_FLUSH_SEC:
+            return
+        try:
+            text = "\n".join(self.mirror_tail) + "\n"
+            # serialize + write once; the per-guild path is a hardlink to the same bytes
+            _atomic_write_text(MIRROR_PATH_DEFAULT, text)
+            _link_or_copy(MIRROR_PATH_DEFAULT, self.mirror_per_guild, text)
+            self.mirror_pending = 0
+            self.mirror_written_at = now
+            logger.info(f"[Guild {self.guild_id}] Mirror written{note}.")
+        except Exception as e:
+            logger.debug(f"[Guild {self.guild_id}] Mirror write failed: {e}")
 
-            # ===== API discovery
-            api_name, api_download_url, api_diag = await _to_thread(_nitrado_api_get_latest, cfg)
-            if api_name:
-                logger.info(f"[Guild {guild_id}] API latest hint: {api_name} ({api_diag})")
-            else:
-                logger.info(f"[Guild {guild_id}] API latest hint unavailable: {api_diag}")
-
-            if not files and not api_name:
-                logger.debug(f"[Guild {guild_id}] No .ADM files found; PWD={pwd_now}")
-                logger.info(f"[Guild {guild_id}] NLST sample: {raw_nlst[:20]}")
-                logger.info(f"[Guild {guild_id}] LIST sample: {raw_list[:20]}")
-                await _to_thread(ftp.quit)
-                if last_seen_hash is not None:
-                    logger.info(f"[Guild {guild_id}] Last line hash #{last_seen_hash}: {last_seen_line[:160]}")
-                # write mirror if we had pending lines
-                if mirror_dirty:
-                    try:
-                        text = "\n".join(mirror_tail) + "\n"
-                        _atomic_write_text(MIRROR_PATH_DEFAULT, text)
-                        _atomic_write_text(mirror_per_guild, text)
-                        mirror_dirty = False
-                        logger.info(f"[Guild {guild_id}] Mirror written (no files branch).")
-                    except Exception as e2:
-                        logger.debug(f"[Guild {guild_id}] Mirror write failed: {e2}")
-                await asyncio.sleep(interval)
-                continue
 
-            latest_name, latest_size_guess, latest_mtime = (None, 0, None)
-            if files:
-                latest_name, latest_size_guess, latest_mtime = _choose_latest_adm(files)
+async def _poll_cycle(st: GuildPollState, cb: LineCallback) -> None:
+    """One FTP/API poll for a guild. Returns early when there is nothing to read."""
+    guild_id, cfg, directory, interval = st.guild_id, st.cfg, st.directory, st.interval
 
-            # === CHOOSER: Prefer API newest whenever present ===
-            chosen_name = None
-            chosen_mtime = None
-            chosen_api_url = None
+    # Reuse the session from the last cycle; NOOP catches sockets the server dropped.
+    ftp = st.ftp
+    if ftp is not None and not await _to_thread(_ftp_alive, ftp):
+        logger.info(f"[Guild {guild_id}] FTP session went stale; reconnecting.")
+        st.close_ftp()
+        ftp = None
+    if ftp is None:
+        ftp = st.ftp = await _to_thread(_ftp_connect, cfg)
 
-            if api_name:
-                chosen_name = api_name
-                chosen_mtime = _parse_name_ts(api_name)
-                chosen_api_url = api_download_url
-                logger.info(
-                    f"[Guild {guild_id}] Preferring API file '{api_name}' over FTP newest '{latest_name}'."
-                )
-            else:
-                chosen_name = latest_name
-                chosen_mtime = latest_mtime
-                logger.info(
-                    f"[Guild {guild_id}] No API file available; using FTP newest '{latest_name}'."
-                )
-
-            # Candidate table (old→new, last few entries)
-            if files:
-                pretty = [
-                    {"name": n, "size": s, "mtime": (mt.isoformat() if mt else None)}
-                    for n, s, mt in sorted(files, key=lambda r: (r[2] or _parse_name_ts(r[0]) or datetime.min))
-                ]
-                logger.info(f"[Guild {guild_id}] PWD={pwd_now}")
-                logger.info(f"[Guild {guild_id}] ADM candidates (old→new): {pretty[-6:]}")
-                logger.debug(f"[Guild {guild_id}] NLST raw (trim): {raw_nlst[-10:]}")
-                logger.debug(f"[Guild {guild_id}] LIST raw (trim): {raw_list[-10:]}")
-
-            if not chosen_name:
-                await _to_thread(ftp.quit)
-                # write mirror if needed
-                if mirror_dirty:
-                    try:
-                        text = "\n".join(mirror_tail) + "\n"
-                        _atomic_write_text(MIRROR_PATH_DEFAULT, text)
-                        _atomic_write_text(mirror_per_guild, text)
-                        mirror_dirty = False
-                        logger.info(f"[Guild {guild_id}] Mirror written (no chosen file).")
-                    except Exception as e2:
-                        logger.debug(f"[Guild {guild_id}] Mirror write failed: {e2}")
-                await asyncio.sleep(interval)
-                continue
+    # Enter the configured directory (once per session; every later command is CWD-relative)
+    try:
+        if not st.ftp_in_dir:
+            await _to_thread(ftp.cwd, directory)
+            st.ftp_in_dir = True
+    except Exception as e:
+        try:
+            pwd = await _to_thread(ftp.pwd)
+        except Exception:
+            pwd = "(unknown)"
+        logger.error(f"[Guild {guild_id}] CWD to '{directory}' failed from PWD={pwd}: {e}", exc_info=True)
+        try:
+            root_ls = await _to_thread(_ftp_list_names, ftp, "/")
+            logger.info(f"[Guild {guild_id}] FTP root entries: {root_ls[:40]}")
+        except Exception:
+            pass
+        st.close_ftp()
+        # attempt to keep mirror current even if no new data (no-op if not dirty)
+        st.write_mirror(" (no data branch)")
+        return
 
-            logger.info(
-                f"[Guild {guild_id}] Chosen active file: {chosen_name} "
-                f"(FTP newest={latest_name}, API newest={api_name})"
-            )
+    # ===== directory scan (MLSD, falling back to NLST → LIST)
+    cached = st.list_cache
+    if cached and st.file_growing and time.monotonic() - cached[0] < LIST_CACHE_SEC:
+        _, files, pwd_now = cached
+    else:
+        files = await _to_thread(_list_adm_files, ftp)
+        try:
+            pwd_now = await _to_thread(ftp.pwd)
+        except Exception:
+            pwd_now = "(unknown)"
+        st.list_cache = (time.monotonic(), files, pwd_now) if files else None
+
+    # ===== API discovery
+    api_name, api_download_url, api_diag = await _to_thread(_nitrado_api_get_latest, cfg)
+    if api_name:
+        logger.info(f"[Guild {guild_id}] API latest hint: {api_name} ({api_diag})")
+    else:
+        logger.info(f"[Guild {guild_id}] API latest hint unavailable: {api_diag}")
+
+    if not files and not api_name:
+        logger.debug(f"[Guild {guild_id}] No .ADM files found; PWD={pwd_now}")
+        raw_nlst, raw_list = await _raw_listings(ftp)
+        logger.info(f"[Guild {guild_id}] NLST sample: {raw_nlst[:20]}")
+        logger.info(f"[Guild {guild_id}] LIST sample: {raw_list[:20]}")
+        # write mirror if we had pending lines
+        st.write_mirror(" (no files branch)")
+        return
 
-            # Switch if changed
-            if latest_file != chosen_name:
-                logger.info(f"[Guild {guild_id}] Switching ADM {latest_file or '<none>'} → {chosen_name}")
-                latest_file = chosen_name
-                offset = 0
-                set_guild_state(guild_id, latest_file=latest_file, offset=offset)
+    latest_name, latest_size_guess, latest_mtime = (None, 0, None)
+    if files:
+        latest_name, latest_size_guess, latest_mtime = _choose_latest_adm(files)
+
+    # === CHOOSER: Prefer API newest whenever present ===
+    chosen_name = None
+    chosen_mtime = None
+    chosen_api_url = None
+
+    if api_name:
+        chosen_name = api_name
+        chosen_mtime = _parse_name_ts(api_name)
+        chosen_api_url = api_download_url
+        logger.info(
+            f"[Guild {guild_id}] Preferring API file '{api_name}' over FTP newest '{latest_name}'."
+        )
+    else:
+        chosen_name = latest_name
+        chosen_mtime = latest_mtime
+        logger.info(
+            f"[Guild {guild_id}] No API file available; using FTP newest '{latest_name}'."
+        )
+
+    # Candidate table (old→new, last few entries)
+    if files:
+        pretty = [
+            {"name": n, "size": s, "mtime": (mt.isoformat() if mt else None)}
+            for n, s, mt in sorted(files, key=lambda r: (r[2] or _parse_name_ts(r[0]) or datetime.min))
+        ]
+        logger.info(f"[Guild {guild_id}] PWD={pwd_now}")
+        logger.info(f"[Guild {guild_id}] ADM candidates (old→new): {pretty[-6:]}")
+        if logger.isEnabledFor(logging.DEBUG):
+            raw_nlst, raw_list = await _raw_listings(ftp)
+            logger.debug(f"[Guild {guild_id}] NLST raw (trim): {raw_nlst[-10:]}")
+            logger.debug(f"[Guild {guild_id}] LIST raw (trim): {raw_list[-10:]}")
+
+    if not chosen_name:
+        # write mirror if needed
+        st.write_mirror(" (no chosen file)")
+        return
 
-            # Heartbeat for current file (FTP probe)
-            size = await _to_thread(_ftp_size, ftp, latest_file)
-            mdtm = await _to_thread(_ftp_mdtm, ftp, latest_file)
+    logger.info(
+        f"[Guild {guild_id}] Chosen active file: {chosen_name} "
+        f"(FTP newest={latest_name}, API newest={api_name})"
+    )
+
+    # Switch if changed
+    if st.latest_file != chosen_name:
+        logger.info(f"[Guild {guild_id}] Switching ADM {st.latest_file or '<none>'} → {chosen_name}")
+        st.latest_file = chosen_name
+        st.offset = 0
+        st.partial_end = None
+        set_guild_state(guild_id, latest_file=st.latest_file, offset=st.offset)
+    latest_file = st.latest_file
+
+    # Heartbeat for current file (FTP probe); MDTM only feeds the debug line
+    size = await _to_thread(_ftp_size, ftp, latest_file)
+    debug = logger.isEnabledFor(logging.DEBUG)
+    mdtm = await _to_thread(_ftp_mdtm, ftp, latest_file) if debug else None
+
+    if size is not None and st.offset > size:
+        logger.info(
+            f"[Guild {guild_id}] Offset {st.offset} > size {size} for {latest_file}; resetting to 0 (rollover/truncation)."
+        )
+        st.offset = 0
+        set_guild_state(guild_id, latest_file=latest_file, offset=st.offset)
+    offset = st.offset
+
+    if debug:
+        logger.debug(
+            f"[Guild {guild_id}] HEARTBEAT: file={latest_file} size={size} mdtm={mdtm} offset={offset}"
+        )
+
+    # Try ranged read via FTP first (ok if chosen_name is the API file; FTP may still have it!)
+    # SIZE == offset means nothing new: skip opening a data connection for an empty RETR.
+    blob: bytes | bytearray = b""
+    if size is None or size > offset:
+        try:
+            blob = await _to_thread(_ftp_read_range_in_cwd, ftp, latest_file, offset)
+        except Exception as e:
+            logger.info(f"[Guild {guild_id}] FTP RETR failed for {latest_file}: {e}")
 
-            if size is not None and offset > size:
+    # If no data via FTP and we have API URL for the chosen file, try HTTP
+    http_size = None
+    http_used = False
+    if (not blob) and chosen_api_url:
+        try:
+            # Ask for just the tail; servers that ignore Range answer 200 with the whole file.
+            range_hdr = {"Range": f"bytes={offset}-"} if offset > 0 else None
+            r = await _to_thread(_HTTP.get, chosen_api_url, headers=range_hdr, timeout=HTTP_TIMEOUT_SEC)
+            if r.status_code == 206 and str(r.headers.get("Content-Range", "")).startswith(f"bytes {offset}-"):
+                blob = r.content or b""
+                http_size = offset + len(blob)
+                http_used = True
+                size = http_size
                 logger.info(
-                    f"[Guild {guild_id}] Offset {offset} > size {size} for {latest_file}; resetting to 0 (rollover/truncation)."
+                    f"[Guild {guild_id}] HTTP fallback used for {latest_file} "
+                    f"(ranged read: {len(blob)} bytes from offset {offset})."
                 )
-                offset = 0
-                set_guild_state(guild_id, latest_file=latest_file, offset=offset)
-
-            logger.debug(
-                f"[Guild {guild_id}] HEARTBEAT: file={latest_file} size={size} mdtm={mdtm} offset={offset}"
-            )
-
-            # Try ranged read via FTP first (ok if chosen_name is the API file; FTP may still have it!)
-            blob: bytes = b""
-            try:
-                blob = await _to_thread(_ftp_read_range_in_cwd, ftp, latest_file, offset)
-            except Exception as e:
-                logger.info(f"[Guild {guild_id}] FTP RETR failed for {latest_file}: {e}")
-
-            # If no data via FTP and we have API URL for the chosen file, try HTTP
-            full_fetch_used = False
-            http_size = None
-            http_used = False
-            if (not blob) and chosen_api_url:
-                try:
-                    r = await _to_thread(requests.get, chosen_api_url, )
-                    if r.status_code == 200 and r.content is not None:
-                        http_bytes = r.content
-                        http_size = len(http_bytes)
-                        data_to_process = http_bytes[offset:] if offset < http_size else b""
-                        blob = data_to_process
-                        full_fetch_used = True
-                        http_used = True
-                        size = http_size
-                        logger.info(
-                            f"[Guild {guild_id}] HTTP fallback used for {latest_file} "
-                            f"(downloaded {http_size} bytes, tail={len(blob)} from offset {offset})."
-                        )
-                    else:
-                        logger.info(f"[Guild {guild_id}] HTTP fallback failed HTTP {r.status_code}")
-                except Exception as e:
-                    logger.info(f"[Guild {guild_id}] HTTP fallback error: {e}")
-
-            await _to_thread(ftp.quit)
-
-            if not blob:
+            elif r.status_code == 416:
+                logger.debug(f"[Guild {guild_id}] HTTP fallback: offset {offset} is at/after EOF.")
+            elif r.status_code == 200 and r.content is not None:
+                http_bytes = r.content
+                http_size = len(http_bytes)
+                data_to_process = http_bytes[offset:] if offset < http_size else b""
+                blob = data_to_process
+                http_used = True
+                size = http_size
                 logger.info(
-                    f"[Guild {guild_id}] No new bytes (file={latest_file} size={size} offset={offset}); waiting {interval}s."
+                    f"[Guild {guild_id}] HTTP fallback used for {latest_file} "
+                    f"(downloaded {http_size} bytes, tail={len(blob)} from offset {offset})."
                 )
             else:
-                prev_offset = offset
-                if full_fetch_used and http_size is not None:
-                    offset = http_size
-                else:
-                    offset += len(blob)
-
-                set_guild_state(guild_id, latest_file=latest_file, offset=offset)
-                logger.info(
-                    f"[Guild {guild_id}] Read {len(blob)} bytes from {latest_file} (prev_offset={prev_offset} -> {offset})."
-                )
+                logger.info(f"[Guild {guild_id}] HTTP fallback failed HTTP {r.status_code}")
+        except Exception as e:
+            logger.info(f"[Guild {guild_id}] HTTP fallback error: {e}")
+
+    st.file_growing = bool(blob)
+    # Only consume whole lines: a trailing partial line (server mid-write) stays
+    # behind the offset and is re-read complete next cycle. If the file has not
+    # grown for a whole interval since, that line is final: take it as-is.
+    consumed = blob.rfind(b"\n") + 1 if blob else 0
+    end = offset + len(blob)
+    if blob and consumed < len(blob):
+        if st.partial_end == end:
+            logger.info(
+                f"[Guild {guild_id}] {latest_file} unchanged for {interval}s; taking its unterminated last line."
+            )
+            consumed = len(blob)
+            st.partial_end = None
+        else:
+            st.partial_end = end
+    else:
+        st.partial_end = None
+    if not blob:
+        logger.info(
+            f"[Guild {guild_id}] No new bytes (file={latest_file} size={size} offset={offset}); waiting {interval}s."
+        )
+    elif not consumed:
+        logger.info(
+            f"[Guild {guild_id}] Only a partial line ({len(blob)} bytes) past offset {offset}; waiting {interval}s."
+        )
+    else:
+        prev_offset = offset
+        # blob always starts at `offset` (ranged FTP/HTTP read, or the sliced full download)
+        st.offset = offset + consumed
+
+        set_guild_state(guild_id, latest_file=latest_file, offset=st.offset)
+        logger.info(
+            f"[Guild {guild_id}] Read {len(blob)} bytes from {latest_file} (prev_offset={prev_offset} -> {st.offset})."
+        )
+
+        text = (blob if consumed == len(blob) else blob[:consumed]).decode("utf-8", errors="ignore")
+        now = datetime.now(timezone.utc)
+
+        # Mark source as ftp: or api: so you can see which path was used
+        src_prefix = "api" if http_used else "ftp"
+        for idx, line in enumerate(text.splitlines()):
+            if not st.remember_line(line):
+                continue
+            # reuse the fingerprint remember_line just computed
+            if st.buffer.accept_with_fp(line, st.last_seen_hash):
+                # append to local rolling mirror (splitlines() already dropped the EOL)
+                st.mirror_tail.append(line)
+                st.mirror_pending += 1
+                source = f"{src_prefix}:{latest_file}#~{prev_offset}+{idx}"
+                await cb(guild_id, line, source, now)
 
-                text = blob.decode("utf-8", errors="ignore")
-                now = datetime.now(timezone.utc)
-
-                # Mark source as ftp: or api: so you can see which path was used
-                src_prefix = "api" if http_used else "ftp"
-                for idx, line in enumerate(text.splitlines()):
-                    if not _remember_line(line):
-                        continue
-                    if buffer.accept(line):
-                        # append to local rolling mirror
-                        mirror_tail.append(line.rstrip("\r\n"))
-                        mirror_dirty = True
-                        source = f"{src_prefix}:{latest_file}#~{prev_offset}+{idx}"
-                        await cb(guild_id, line, source, now)
-
-            # After processing this cycle, write mirror if dirty
-            if mirror_dirty:
-                try:
-                    text = "\n".join(mirror_tail) + "\n"
-                    _atomic_write_text(MIRROR_PATH_DEFAULT, text)
-                    _atomic_write_text(mirror_per_guild, text)
-                    mirror_dirty = False
-                    logger.info(f"[Guild {guild_id}] Mirror written: {MIRROR_PATH_DEFAULT} (+ per-guild).")
-                except Exception as e:
-                    logger.debug(f"[Guild {guild_id}] Mirror write failed: {e}")
+    # After processing this cycle, write mirror if dirty
+    st.write_mirror(f": {MIRROR_PATH_DEFAULT} (+ per-guild)")
 
-        except Exception as e:
-            logger.error(f"[Guild {guild_id}] FTP poll error: {e}", exc_info=True)
 
-        if last_seen_hash is not None:
-            logger.info(f"[Guild {guild_id}] Last line hash #{last_seen_hash}: {last_seen_line[:160]}")
+async def poll_guild_once(st: GuildPollState, cb: LineCallback) -> None:
+    """
+    Run a single poll cycle for a guild. Reads new bytes since the last
+    offset; if a newer ADM file appears, automatically switches to it.
+    Never raises (errors are logged) so a scheduler can call it blindly.
+    """
+    try:
+        await _poll_cycle(st, cb)
+    except Exception as e:
+        logger.error(f"[Guild {st.guild_id}] FTP poll error: {e}", exc_info=True)
+        # the session may be mid-transfer or dead; start clean next cycle
+        st.close_ftp()
 
-        await asyncio.sleep(interval)
+    if st.last_seen_hash is not None:
+        logger.info(f"[Guild {st.guild_id}] Last line hash #{st.last_seen_hash}: {st.last_seen_line[:160]}")
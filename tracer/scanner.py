@@ -1,8 +1,9 @@
 # tracer/scanner.py
 import re
 import logging
+from collections import OrderedDict
 from datetime import datetime, timezone
-from typing import Optional, Tuple, Dict
+from typing import Optional, Tuple
 
 from tracer.tracker import append_point
 
@@ -18,8 +19,11 @@ RE_TIME_PREFIX = re.compile(r"^\s*(?P<hh>\d{2}):(?P<mm>\d{2}):(?P<ss>\d{2})\s+\|
 
 # Common "pos=<x,z,y>" lines:
 #   15:44:16 | Player "SoulTatted94" (...) pos=<5188.7, 10319.5, 191.2> ...
+# "[^<]*+(?<=pos=)<" == the old lazy "[^<]*?pos=<" (the first "<" after the name must
+# be the pos one) but runs to that "<" in one possessive sweep (Python 3.11+),
+# instead of trying "pos=<" at every character.
 RE_POS = re.compile(
-    r'Player\s+"(?P<name>[^"]+)"[^<]*?pos=<\s*'
+    r'Player\s+"(?P<name>[^"]+)"[^<]*+(?<=pos=)<\s*'
     r'(?P<x>-?\d+(?:\.\d+)?)\s*,\s*'
     r'(?P<z>-?\d+(?:\.\d+)?)\s*,\s*'
     r'(?P<y>-?\d+(?:\.\d+)?)\s*>',
@@ -48,29 +52,38 @@ RE_FALLBACK = re.compile(
 
 # Suppress trivial wiggles (in X/Z). 0 means "only drop exact duplicates".
 MIN_DXZ = 0.0
+_MIN_DXZ_SQ = MIN_DXZ * MIN_DXZ
 
-def _dxz(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+def _dxz_sq(a: Tuple[float, float], b: Tuple[float, float]) -> float:
+    """Squared X/Z distance (compare against _MIN_DXZ_SQ; no sqrt needed)."""
     dx = a[0] - b[0]
     dz = a[1] - b[1]
-    return (dx * dx + dz * dz) ** 0.5
+    return dx * dx + dz * dz
 
 # Remember last X/Z emitted per player to de-dupe adjacent points.
-_last_xz: Dict[str, Tuple[float, float]] = {}
+# LRU-bounded so player churn on long-running servers can't grow it without limit;
+# an evicted player just skips the de-dupe for one point.
+_LAST_XZ_MAX = 4096
+_last_xz: OrderedDict[str, Tuple[float, float]] = OrderedDict()
 
 def _maybe_parse_ts_prefix(line: str, fallback: datetime) -> datetime:
     """
     If the ADM line begins with 'HH:MM:SS |', build a UTC datetime using today's date.
     Otherwise return the provided fallback timestamp.
     """
-    m = RE_TIME_PREFIX.match(line)
-    if not m:
-        return fallback
+    # Fast path: the usual fixed-width "HH:MM:SS |" at column 0, sliced without the regex
+    hh, mm, ss = line[0:2], line[3:5], line[6:8]
+    if not (
+        line[2:3] == ":" and line[5:6] == ":" and line[8:10] == " |"
+        and hh.isdigit() and mm.isdigit() and ss.isdigit()
+    ):
+        m = RE_TIME_PREFIX.match(line)  # leading/extra whitespace variants
+        if not m:
+            return fallback
+        hh, mm, ss = m.group("hh"), m.group("mm"), m.group("ss")
     try:
-        hh = int(m.group("hh"))
-        mm = int(m.group("mm"))
-        ss = int(m.group("ss"))
-        base = fallback.astimezone(timezone.utc)
-        return datetime(base.year, base.month, base.day, hh, mm, ss, tzinfo=timezone.utc)
+        base = fallback if fallback.tzinfo is timezone.utc else fallback.astimezone(timezone.utc)
+        return datetime(base.year, base.month, base.day, int(hh), int(mm), int(ss), tzinfo=timezone.utc)
     except Exception:
         return fallback
 
@@ -86,12 +99,19 @@ def _emit_point(
     """Append to the tracker if not a trivial duplicate; True if appended."""
     xz = (float(x), float(z))
     last = _last_xz.get(name)
-    if last is not None and _dxz(last, xz) <= MIN_DXZ:
-        return False
+    if last is not None:
+        if MIN_DXZ == 0.0:
+            if last == xz:
+                return False
+        elif _dxz_sq(last, xz) <= _MIN_DXZ_SQ:
+            return False
 
     # tracker.append_point expects (x, y, z) with y = altitude; z = north/south.
     append_point(name, float(x), float(y), float(z), ts=ts, source=source, guild_id=guild_id)
     _last_xz[name] = xz
+    _last_xz.move_to_end(name)
+    if len(_last_xz) > _LAST_XZ_MAX:
+        _last_xz.popitem(last=False)
     log.debug(f"scanner: +point [{name}] @ ({x},{z}) via {source}")
     return True
 
@@ -101,11 +121,15 @@ async def scan_adm_line(guild_id: int, line: str, source_ref: str, timestamp: da
     Entry point used by the poller (signature matches LineCallback).
     Extracts {name,x,z,y} from ADM lines and forwards to tracker.
     """
-    # Prefer the HH:MM:SS in the line when available so points line up to ADM time.
-    event_ts = _maybe_parse_ts_prefix(line, timestamp)
-
-    m = RE_POS.search(line)
-    if not m:
+    # Every pattern needs a quoted player name and a "<x, z, y>" triple: most ADM
+    # lines (hits, chat, admin noise) lack one and can skip all three regex scans.
+    if "<" not in line or '"' not in line:
+        return
+
+    # Heartbeat "pos=<...>" lines dominate, so RE_POS goes first -- but only if the
+    # case-free "=<" it requires is there at all (teleport/action lines lack it).
+    m = RE_POS.search(line) if "=<" in line else None
+    if not m and "teleport" in line.lower():  # RE_TP is case-insensitive too
         m = RE_TP.search(line)
 
     if not m and (
@@ -120,11 +144,15 @@ async def scan_adm_line(guild_id: int, line: str, source_ref: str, timestamp: da
     if not m:
         return  # Not a positional line we care about.
 
-    name = m.group("name").strip()
+    # Prefer the HH:MM:SS in the line when available so points line up to ADM time.
+    event_ts = _maybe_parse_ts_prefix(line, timestamp)
+
+    name, sx, sz, sy = m.group("name", "x", "z", "y")
+    name = name.strip()
     try:
-        x = float(m.group("x"))
-        z = float(m.group("z"))  # second value is Z in DayZ logs
-        y = float(m.group("y"))  # altitude (third)
+        x = float(sx)
+        z = float(sz)  # second value is Z in DayZ logs
+        y = float(sy)  # altitude (third)
     except Exception:
         return  # Parse failure; ignore.
 
@@ -2,9 +2,12 @@
 import os, time, asyncio
 import logging
 from datetime import datetime, timezone
+from functools import lru_cache
 from pathlib import Path
+from types import MappingProxyType
 from typing import Dict, Tuple, Optional, Any, List
-from collections import defaultdict, deque
+from collections import OrderedDict, defaultdict, deque
+from concurrent.futures import ThreadPoolExecutor
 
 from utils.storageClient import load_file, save_file  # your existing helpers
 from tracer.config import INDEX_PATH, TRACKS_DIR, MAX_POINTS_PER_PLAYER
@@ -14,6 +17,7 @@ logger = logging.getLogger(__name__)
 # -----------------------------------------------------------------------------
 # Small helpers: normalization
 # -----------------------------------------------------------------------------
+@lru_cache(maxsize=8192)  # per point, over a small set of gamertags
 def _norm_tag(s: str) -> str:
     """Canonicalize a gamertag for keys/IDs. Case-insensitive & trimmed."""
     return (s or "").strip().casefold()
@@ -22,8 +26,18 @@ def _norm_map(s: Optional[str]) -> Optional[str]:
     return (s or "").strip().lower() if s else None
 
 def _pretty_ts(dt: datetime) -> str:
+    if dt.tzinfo is timezone.utc:  # the usual case: format directly, no isoformat + replace
+        s = f"{dt.year:04d}-{dt.month:02d}-{dt.day:02d}T{dt.hour:02d}:{dt.minute:02d}:{dt.second:02d}"
+        return f"{s}.{dt.microsecond:06d}Z" if dt.microsecond else f"{s}Z"
     return dt.isoformat().replace("+00:00", "Z")
 
+def _ts_epoch(ts: Any) -> int:
+    """Unix seconds for a stored ISO "ts" (0 if missing/malformed)."""
+    try:
+        return int(datetime.fromisoformat(ts.replace("Z", "+00:00")).timestamp())
+    except Exception:
+        return 0
+
 def _short_id(pid: str) -> str:
     return pid.split("-", 1)[-1] if "-" in pid else pid
 
@@ -33,7 +47,9 @@ def _short_id(pid: str) -> str:
 THROTTLE_APPEND_SECS = 5.0   # How often (in seconds) we allow an INFO "append" log per player
 THROTTLE_INDEX_SECS  = 30.0  # How often we allow an INFO "indexed new player" log for the same tag
 
-_last_log_ts: Dict[str, float] = {}
+# LRU-bounded: keys are per player, so churn would otherwise grow this forever.
+_LAST_LOG_MAX = 4096
+_last_log_ts: OrderedDict[str, float] = OrderedDict()
 
 def _should_log(key: str, interval: float) -> bool:
     """Return True if enough time has passed since last log for this key."""
@@ -41,6 +57,9 @@ def _should_log(key: str, interval: float) -> bool:
     last = _last_log_ts.get(key, 0.0)
     if now - last >= interval:
         _last_log_ts[key] = now
+        _last_log_ts.move_to_end(key)
+        if len(_last_log_ts) > _LAST_LOG_MAX:
+            _last_log_ts.popitem(last=False)  # least recently logged
         return True
     return False
 # -----------------------------------------------------------------------------
@@ -79,15 +98,19 @@ _ensure_tracks_dir()
 
 
 # --- Simple subscription bus for "point appended" events ---------------------
-_point_subscribers: list = []  # list[Callable[[int|None,str,dict], Awaitable[None]]]
+_point_subscribers: list = []  # list[Callable[[int|None,str,Mapping], Awaitable[None]]]
+# Frozen copy iterated per point; rebuilt only when someone subscribes
+_subs_snapshot: tuple = ()
 
 def subscribe_to_points(callback):
-    """callback(guild_id:int|None, gamertag:str, point:dict) -> Awaitable[None]"""
+    """callback(guild_id:int|None, gamertag:str, point:Mapping) -> Awaitable[None] (point is read-only)"""
+    global _subs_snapshot
     _point_subscribers.append(callback)
+    _subs_snapshot = tuple(_point_subscribers)
     logger.debug(f"Registered point subscriber: {getattr(callback, '__name__', str(callback))}")
 
 async def _notify_point(guild_id, gamertag, point):
-    for cb in list(_point_subscribers):
+    for cb in _subs_snapshot:
         try:
             coro = cb(guild_id, gamertag, point)
             if asyncio.iscoroutine(coro):
@@ -103,51 +126,76 @@ def _sanitize_id(name: str) -> str:
 
 
 def _index_set(index: Dict[str, str], display_tag: str, pid: str) -> None:
+    """Store the player under their normalized (trimmed, casefolded) tag; lookups normalize too."""
+    index[_norm_tag(display_tag)] = pid
+
+
+def _collapse_index(raw: Dict[str, str]) -> Dict[str, str]:
     """
-    Store multiple keys for the same player so lookups are flexible:
-    - exact as seen (for backwards compatibility)
-    - lower()
-    - normalized (casefold)
+    Fold an older index (exact + lower + normalized keys per player) down to
+    normalized keys only. Where the forms disagree, the normalized entry wins.
     """
-    index[display_tag] = pid
-    index[display_tag.lower()] = pid
-    index[_norm_tag(display_tag)] = pid
+    index: Dict[str, str] = {}
+    for k, v in raw.items():
+        nk = _norm_tag(k)
+        if nk not in index or k == nk:
+            index[nk] = v
+    return index
+
+
+# In-memory mirror of INDEX_PATH (this module is its only writer): loaded on first
+# use and mutated in place. Changes (new players only) are written through right
+# away; a failed write stays dirty and is retried by the buffered flush.
+_INDEX: Optional[Dict[str, str]] = None
+_INDEX_DIRTY = False
+
+def _index() -> Dict[str, str]:
+    global _INDEX, _INDEX_DIRTY
+    if _INDEX is None:
+        raw = load_file(INDEX_PATH) or {}
+        _INDEX = _collapse_index(raw)
+        if _INDEX != raw:  # one-shot migration of an older multi-key index
+            logger.info(f"Collapsed player index to normalized keys ({len(raw)} -> {len(_INDEX)})")
+            _INDEX_DIRTY = True
+            _flush_index()
+    return _INDEX
+
+def _flush_index() -> None:
+    global _INDEX_DIRTY
+    if not _INDEX_DIRTY or _INDEX is None:
+        return
+    try:
+        save_file(INDEX_PATH, _INDEX)
+        _INDEX_DIRTY = False
+    except Exception as e:
+        logger.error(f"Failed to save player index: {e}", exc_info=True)
 
 
 def _resolve_player_id(gamertag: str) -> Tuple[str, str]:
     """
     Returns (pid, canonical_display_tag).
-    Ensures the index contains exact/lower/normalized forms for lookups.
+    Indexes unseen players under their normalized tag.
     """
-    index = load_file(INDEX_PATH) or {}
-    t_exact = gamertag
-    t_lower = gamertag.lower()
-    t_norm  = _norm_tag(gamertag)
-
-    pid: Optional[str] = None
-    # Fast paths
-    pid = index.get(t_exact) or index.get(t_lower) or index.get(t_norm)
+    global _INDEX_DIRTY
+    index = _index()
+    pid = index.get(_norm_tag(gamertag))
 
     if not pid:
         pid = f"xbox-{_sanitize_id(gamertag)}"
         _index_set(index, gamertag, pid)
-        save_file(INDEX_PATH, index)
+        _INDEX_DIRTY = True
+        _flush_index()
         if _should_log(f"index:{pid}", THROTTLE_INDEX_SECS):
             logger.info(f"Indexed new player: {gamertag} -> {pid}")
         else:
             logger.debug(f"Indexed new player (throttled): {gamertag} -> {pid}")
-    else:
-        # Backfill normalized key if this is an older index
-        if t_norm not in index:
-            _index_set(index, gamertag, pid)
-            save_file(INDEX_PATH, index)
 
     return pid, gamertag
 
 
 def _track_path(pid: str) -> str:
-    # Defensive: ensure again before each write/read in case runtime state changed
-    _ensure_tracks_dir()
+    # The dir is checked once at import; if it vanishes at runtime, save_file
+    # recreates it (mkdir parents) and a read just finds no file.
     return str(_TRACKS_DIR_PATH / f"{pid}.json")
 
 
@@ -156,6 +204,9 @@ def _track_path(pid: str) -> str:
 # =============================================================================
 # Per-player in-memory queues of new points (dicts)
 _buffers: Dict[str, deque] = defaultdict(deque)
+# (x, z) of the last point on disk per player, so an empty buffer needn't re-read
+# the track file for the adjacent-duplicate check
+_last_saved_xz: Dict[str, Tuple[Any, Any]] = {}
 # Last time we flushed any buffer (epoch seconds)
 _last_flush_ts: float = 0.0
 # Flush policy
@@ -163,18 +214,39 @@ _FLUSH_INTERVAL = 15        # seconds: flush all buffers at least this often
 _MAX_BUFFER_POINTS = 10     # flush a player's buffer if it reaches this size
 
 
-def _flush_pid(pid: str, doc_gamertag_fallback: str | None = None) -> None:
-    """Flush the buffer for a single player ID, if any."""
+# Warm track docs of recently flushed/read players, so a flush doesn't re-read and
+# re-parse the whole file it's about to rewrite. Kept small: a full doc is
+# MAX_POINTS_PER_PLAYER point dicts.
+_DOC_CACHE_MAX = 64
+_docs: OrderedDict[str, Dict[str, Any]] = OrderedDict()
+
+def _load_doc(pid: str, gamertag_fallback: str | None = None, create: bool = True) -> Dict[str, Any]:
+    """
+    The player's track doc (cached; read from disk on a cold miss). With no file
+    on disk, a fresh doc is cached only if `create` (i.e. a flush will save it).
+    """
+    doc = _docs.get(pid)
+    if doc is None:
+        doc = load_file(_track_path(pid))
+        if not doc:
+            doc = {"player_id": pid, "gamertag": gamertag_fallback or "unknown", "points": []}
+            if not create:
+                return doc
+        _docs[pid] = doc
+    _docs.move_to_end(pid)
+    if len(_docs) > _DOC_CACHE_MAX:
+        _docs.popitem(last=False)
+    return doc
+
+
+def _stage_pid(pid: str, doc_gamertag_fallback: str | None = None) -> Optional[Tuple[str, Dict[str, Any], int]]:
+    """Move a player's buffered points into their doc; (path, doc, n_new) to save, or None."""
     q = _buffers.get(pid)
     if not q:
-        return
+        return None
 
     path = _track_path(pid)
-    doc = load_file(path) or {
-        "player_id": pid,
-        "gamertag": doc_gamertag_fallback or "unknown",
-        "points": [],
-    }
+    doc = _load_doc(pid, doc_gamertag_fallback)
 
     # extend with queued points, but drop the helper field "gamertag" on write
     new_pts = list(q)
@@ -183,24 +255,50 @@ def _flush_pid(pid: str, doc_gamertag_fallback: str | None = None) -> None:
     doc["points"].extend(new_pts)
 
     if len(doc["points"]) > MAX_POINTS_PER_PLAYER:
-        doc["points"] = doc["points"][-MAX_POINTS_PER_PLAYER:]
+        del doc["points"][:-MAX_POINTS_PER_PLAYER]  # trim in place, no copy
+
+    q.clear()
+    return path, doc, len(new_pts)
+
 
+def _save_staged(pid: str, path: str, doc: Dict[str, Any], n_new: int) -> None:
     try:
         save_file(path, doc)
-        logger.debug(f"Flushed {len(new_pts)} pts for {doc.get('gamertag')} (total={len(doc['points'])})")
+        if doc["points"]:
+            last = doc["points"][-1]
+            _last_saved_xz[pid] = (last.get("x"), last.get("z"))
+        logger.debug(f"Flushed {n_new} pts for {doc.get('gamertag')} (total={len(doc['points'])})")
     except Exception as e:
         logger.error(f"Failed to flush track for {pid}: {e}", exc_info=True)
 
-    q.clear()
 
+def _flush_pid(pid: str, doc_gamertag_fallback: str | None = None) -> None:
+    """Flush the buffer for a single player ID, if any."""
+    staged = _stage_pid(pid, doc_gamertag_fallback)
+    if staged:
+        _save_staged(pid, *staged)
+
+
+# Track-file I/O fan-out: a flush that touches several players overlaps their
+# writes, and the snapshot disk fallback its reads. Callers always wait for the
+# batch, so cached docs aren't mutated mid-save.
+_DISK_POOL = ThreadPoolExecutor(max_workers=16, thread_name_prefix="track-io")
 
 def _flush_maybe(force: bool = False) -> None:
     """Flush all player buffers if interval passed or force=True."""
     global _last_flush_ts
     now = time.time()
     if force or (now - _last_flush_ts) >= _FLUSH_INTERVAL:
+        staged = []
         for pid in list(_buffers.keys()):
-            _flush_pid(pid)
+            st = _stage_pid(pid)
+            if st:
+                staged.append((pid, *st))
+        if len(staged) == 1:
+            _save_staged(*staged[0])
+        elif staged:
+            list(_DISK_POOL.map(lambda a: _save_staged(*a), staged))
+        _flush_index()
         _last_flush_ts = now
 # =============================================================================
 
@@ -211,29 +309,22 @@ def _flush_maybe(force: bool = False) -> None:
 # guild_id -> pid -> last row
 _live_by_guild: Dict[int, Dict[str, Dict[str, Any]]] = defaultdict(dict)
 
-def _update_live(guild_id: int | None, pid: str, canonical: str, point: Dict[str, Any]) -> None:
+def _update_live(
+    guild_id: int | None, pid: str, canonical: str,
+    x: float, y: float, z: float, ts_dt: datetime, map_norm: str | None,
+) -> None:
     """Keep an up-to-date, per-guild latest position for /showtracked."""
     if guild_id is None:
         return
-    ts_val = point.get("ts")
-    if isinstance(ts_val, str):
-        try:
-            ts_dt = datetime.fromisoformat(ts_val.replace("Z", "+00:00"))
-        except Exception:
-            ts_dt = datetime.now(timezone.utc)
-    elif isinstance(ts_val, datetime):
-        ts_dt = ts_val
-    else:
-        ts_dt = datetime.now(timezone.utc)
-
+    # append_point hands over the datetime it already has: no ISO round-trip
     _live_by_guild[guild_id][pid] = {
         "short_id": _short_id(pid),
         "name": canonical,
-        "x": float(point.get("x", 0.0)),
-        "z": float(point.get("z", 0.0)),
-        "y": float(point.get("y", 0.0)),
+        "x": float(x),
+        "z": float(z),
+        "y": float(y),
         "ts": ts_dt,
-        "map": point.get("map"),
+        "map": map_norm,
     }
 # =============================================================================
 
@@ -255,17 +346,6 @@ def append_point(
 
     map_norm = _norm_map(map_name)
 
-    # Build queued point (we keep gamertag only for logging/flush default)
-    point = {
-        "ts": _pretty_ts(ts),
-        "x": x,
-        "y": y,
-        "z": z,
-        "source": source,
-        "map": map_norm,        # kept on disk; show_tracked can filter with it
-        "gamertag": canonical,  # dropped on flush, used for logging
-    }
-
     q = _buffers[pid]
 
     # De-dupe adjacent identical X/Z (check buffer last if present,
@@ -274,18 +354,30 @@ def append_point(
         if (q[-1].get("x"), q[-1].get("z")) == (x, z):
             logger.debug(f"[{canonical}] Duplicate adjacent point ignored at ({x},{z}) from {source}")
             # still update live so /showtracked reflects current heartbeat
-            _update_live(guild_id, pid, canonical, point)
+            _update_live(guild_id, pid, canonical, x, y, z, ts, map_norm)
             return
     else:
-        # Buffer empty: peek last saved point to avoid immediate duplicates
-        path = _track_path(pid)
-        doc = load_file(path)
-        if doc and doc.get("points"):
-            last = doc["points"][-1]
-            if (last.get("x"), last.get("z")) == (x, z):
-                logger.debug(f"[{canonical}] Duplicate (vs saved) point ignored at ({x},{z}) from {source}")
-                _update_live(guild_id, pid, canonical, point)
-                return
+        # Buffer empty: compare with the last saved point (memoized at flush; read once otherwise)
+        if pid not in _last_saved_xz:
+            # cold start: one read, which also warms the doc cache for the next flush
+            pts = _load_doc(pid, canonical, create=False)["points"]
+            _last_saved_xz[pid] = (pts[-1].get("x"), pts[-1].get("z")) if pts else (None, None)
+        if _last_saved_xz.get(pid) == (x, z):
+            logger.debug(f"[{canonical}] Duplicate (vs saved) point ignored at ({x},{z}) from {source}")
+            _update_live(guild_id, pid, canonical, x, y, z, ts, map_norm)
+            return
+
+    # Build queued point (we keep gamertag only for logging/flush default)
+    point = {
+        "ts": _pretty_ts(ts),
+        "ts_epoch": int(ts.timestamp()),  # numeric twin of "ts" for window filters
+        "x": x,
+        "y": y,
+        "z": z,
+        "source": source,
+        "map": map_norm,        # kept on disk; show_tracked can filter with it
+        "gamertag": canonical,  # dropped on flush, used for logging
+    }
 
     # Queue and maybe flush
     q.append(point)
@@ -297,22 +389,25 @@ def append_point(
         logger.debug(f"Track append (throttled) [{canonical}] ({x},{z}) buf={len(q)} map={map_norm}")
 
     # Update live snapshot immediately
-    _update_live(guild_id, pid, canonical, point)
+    _update_live(guild_id, pid, canonical, x, y, z, ts, map_norm)
 
     # Flush rules: per-player size threshold OR global interval
     if len(q) >= _MAX_BUFFER_POINTS:
         _flush_pid(pid, doc_gamertag_fallback=canonical)
     _flush_maybe(force=False)
 
-    # Notify listeners (live pulse etc.)
+    # Notify listeners (live pulse etc.) with a read-only view instead of a copy
+    if not _subs_snapshot:
+        return
+    view = MappingProxyType(point)
     try:
-        asyncio.get_running_loop().create_task(_notify_point(guild_id, canonical, dict(point)))
+        asyncio.get_running_loop().create_task(_notify_point(guild_id, canonical, view))
         logger.debug(f"Notified subscribers for [{canonical}] @ ({x},{z})")
     except RuntimeError:
-        # No running event loop; best-effort synchronous call
+        # No running event loop (scripts/tools only; the bot always has one)
         logger.warning("No running event loop; notifying subscribers synchronously.")
         try:
-            asyncio.run(_notify_point(guild_id, canonical, dict(point)))
+            asyncio.run(_notify_point(guild_id, canonical, view))
         except Exception as e:
             logger.error(f"Synchronous notify failed for {canonical}: {e}", exc_info=True)
 
@@ -326,20 +421,17 @@ def load_track(
     Resolve a player's PID (case-insensitive) then return (pid, doc) limited
     by optional window_hours and/or max_points.
     """
-    from datetime import datetime as _dt
     import time as _time
 
-    index = load_file(INDEX_PATH) or {}
-    q_exact = player_query
-    q_lower = player_query.lower()
-    q_norm  = _norm_tag(player_query)
+    index = _index()
+    q_norm = _norm_tag(player_query)
 
-    pid = index.get(q_exact) or index.get(q_lower) or index.get(q_norm)
+    pid = index.get(q_norm)
 
     if not pid:
         # Prefix search across any style (keep legacy behavior)
         for k, v in index.items():
-            if _norm_tag(k).startswith(q_norm):
+            if k.startswith(q_norm):  # keys are already normalized
                 pid = v
                 break
 
@@ -350,10 +442,10 @@ def load_track(
     # Ensure any buffered points for this player are flushed before read
     _flush_pid(pid)
 
-    # Load doc
-    path = _track_path(pid)
-    doc = load_file(path) or {"player_id": pid, "gamertag": player_query, "points": []}
-    pts = doc.get("points", [])
+    # Load doc (shared with the flush cache: never hand out its points list itself)
+    doc = _load_doc(pid, player_query, create=False)
+    all_pts = doc.get("points", [])
+    pts = all_pts
 
     # Apply time window
     if window_hours:
@@ -361,12 +453,11 @@ def load_track(
         before = len(pts)
         kept: list = []
         for p in pts:
-            try:
-                ts = _dt.fromisoformat(p["ts"].replace("Z", "+00:00")).timestamp()
-            except Exception:
-                # keep malformed timestamps just in case
-                ts = 0
-            if ts >= cutoff:
+            ep = p.get("ts_epoch")
+            if ep is None:
+                # older points: parse once, remembered on the (cached) doc
+                ep = p["ts_epoch"] = _ts_epoch(p.get("ts"))
+            if ep >= cutoff:
                 kept.append(p)
         pts = kept
         logger.debug(f"[tracker.load] window={window_hours}h reduced {before}->{len(pts)} for {doc.get('gamertag')}")
@@ -375,6 +466,8 @@ def load_track(
     if max_points and len(pts) > max_points:
         pts = pts[-max_points:]
         logger.debug(f"[tracker.load] limited to last {max_points} points for {doc.get('gamertag')}")
+    if pts is all_pts:
+        pts = list(pts)
 
     logger.info(f"[tracker.load] Loaded track for {doc.get('gamertag')} with {len(pts)} point(s) (query='{player_query}', norm='{q_norm}')")
     return pid, {**doc, "points": pts}
@@ -383,6 +476,10 @@ def load_track(
 # =============================================================================
 # Snapshot for /showtracked (uses live data; falls back to disk)
 # =============================================================================
+# track file name -> (st_mtime_ns, st_size, last-point row or None), so the disk
+# fallback only re-parses files that changed since the previous snapshot
+_snapshot_rows: Dict[str, Tuple[int, int, Optional[Dict[str, Any]]]] = {}
+
 def get_guild_snapshot(guild_id: int) -> List[Dict[str, Any]]:
     """
     Returns a list of rows: {short_id, name, x, z, y?, ts(datetime), map?}
@@ -402,10 +499,33 @@ def get_guild_snapshot(guild_id: int) -> List[Dict[str, Any]]:
 
     # Fallback: build from disk (latest point per file)
     rows: List[Dict[str, Any]] = []
+    seen: Dict[str, Tuple[int, int, Optional[Dict[str, Any]]]] = {}
     try:
+        misses: List[Tuple[Path, Tuple[int, int]]] = []
         for p in _TRACKS_DIR_PATH.glob("*.json"):
             try:
-                doc = load_file(str(p)) or {}
+                st = p.stat()
+            except OSError as e:
+                logger.debug(f"snapshot(disk): skip {p.name}: {e}")
+                continue
+            key = (st.st_mtime_ns, st.st_size)
+            hit = _snapshot_rows.get(p.name)
+            if hit and hit[:2] == key:
+                seen[p.name] = hit
+                if hit[2] is not None:
+                    rows.append(dict(hit[2]))
+            else:
+                misses.append((p, key))
+
+        # Changed/new files: overlap their reads (file I/O releases the GIL)
+        paths = [str(p) for p, _ in misses]
+        docs = list(_DISK_POOL.map(load_file, paths)) if len(paths) > 1 else [load_file(x) for x in paths]
+
+        for (p, key), doc in zip(misses, docs):
+            try:
+                if doc is not None:  # unreadable (e.g. mid-write): retry next time
+                    seen[p.name] = (*key, None)
+                doc = doc or {}
                 pts = doc.get("points") or []
                 if not pts:
                     continue
@@ -415,7 +535,7 @@ def get_guild_snapshot(guild_id: int) -> List[Dict[str, Any]]:
                     ts_dt = datetime.fromisoformat(ts.replace("Z", "+00:00")) if isinstance(ts, str) else ts
                 except Exception:
                     ts_dt = None
-                rows.append({
+                row = {
                     "short_id": _short_id(doc.get("player_id") or p.stem),
                     "name": doc.get("gamertag") or (doc.get("player_id") or p.stem),
                     "x": float(last.get("x", 0.0)),
@@ -423,9 +543,13 @@ def get_guild_snapshot(guild_id: int) -> List[Dict[str, Any]]:
                     "y": float(last.get("y", 0.0)),
                     "ts": ts_dt,
                     "map": last.get("map"),
-                })
+                }
+                seen[p.name] = (*key, row)
+                rows.append(dict(row))
             except Exception as e:
                 logger.debug(f"snapshot(disk): skip {p.name}: {e}")
+        _snapshot_rows.clear()
+        _snapshot_rows.update(seen)
     except Exception as e:
         logger.error(f"snapshot(disk) failed to enumerate: {e}", exc_info=True)
 
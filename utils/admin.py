@@ -0,0 +1,17 @@
+# utils/admin.py
+import discord
+from discord import app_commands
+
+
+def is_admin(user) -> bool:
+    """Administrator or Manage Server in the current guild."""
+    perms = getattr(user, "guild_permissions", None)
+    return bool(perms and (perms.administrator or perms.manage_guild))
+
+
+def _is_admin(i: discord.Interaction) -> bool:
+    return is_admin(i.user)
+
+
+# One shared check for every admin command: use as `@admin_check` (no call).
+admin_check = app_commands.check(_is_admin)
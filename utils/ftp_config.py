@@ -31,7 +31,7 @@ def set_ftp_config(
     adm_dir: str = "/",
     interval_sec: int = 10,
     **extras: Any,
-):
+) -> bool:
     """
     Save per-guild FTP settings and (optionally) extra keys such as:
       - nitrado_api_token
@@ -40,6 +40,8 @@ def set_ftp_config(
 
     This function MERGES with any existing record to avoid wiping previously
     stored extras when they are not provided in a subsequent call.
+
+    Returns True if the stored record changed, False if it was identical.
     """
     data = _load()
     key = str(guild_id)
@@ -64,10 +66,14 @@ def set_ftp_config(
             continue
         base[k] = v
 
-    # Merge and save
+    # Merge and save (skip the write when nothing actually changed)
+    before = data.get(key)
     current.update(base)
+    if current == before:
+        return False
     data[key] = current
     _save(data)
+    return True
 
 
 def get_ftp_config(guild_id: int) -> Optional[dict]:
@@ -1,10 +1,17 @@
 # utils/linking.py
-import json
+import asyncio
+import functools
+import itertools
 import logging
+import os
 from pathlib import Path
 from typing import Optional, Tuple, Dict, Any
 
+import requests
+from requests.adapters import HTTPAdapter
+
 from utils.settings import load_settings
+from utils.storageClient import atomic_write_bytes, loads, dumps
 from tracer.config import LOCAL_LINKS_PATH  # kept for compatibility; not directly used now
 
 logger = logging.getLogger(__name__)
@@ -14,19 +21,52 @@ def _read_json(path: str) -> dict | list | None:
     if not p.exists():
         return None
     try:
-        return json.loads(p.read_text(encoding="utf-8"))
+        return loads(p.read_bytes())
     except Exception as e:
         logger.error(f"Failed to read JSON from {path}: {e}", exc_info=True)
         return None
 
-def _read_json_url(url: str) -> dict | list | None:
+# url -> (ETag, Last-Modified, parsed body) of the last good fetch, so the
+# periodic refresh can ask "changed?" and skip the download + parse on a 304
+_url_cache: Dict[str, Tuple[Optional[str], Optional[str], Any]] = {}
+
+# Shared across refreshes, so each poll of an external URL reuses a pooled TCP/TLS connection
+_HTTP = requests.Session()
+_HTTP.mount("http://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+_HTTP.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+HTTP_TIMEOUT = (5, 8)  # (connect, read) seconds
+
+def _read_json_url(url: str, parse=None) -> Any:
+    """
+    GET url and parse it: loads() on the body, or `parse(resp, content_length)`
+    when given (its result is what gets cached for 304s and returned).
+    """
+    hit = _url_cache.get(url)
+    headers = {}
+    if hit:
+        if hit[0]:
+            headers["If-None-Match"] = hit[0]
+        if hit[1]:
+            headers["If-Modified-Since"] = hit[1]
     try:
-        import urllib.request
-        with urllib.request.urlopen(url, timeout=8) as resp:
-            return json.load(resp)
+        with _HTTP.get(url, headers=headers, timeout=HTTP_TIMEOUT, stream=True) as resp:
+            if resp.status_code == 304 and hit:
+                return hit[2]  # unchanged (treated as read-only by all callers)
+            resp.raise_for_status()
+            if parse is None:
+                data = loads(resp.content)
+            else:
+                resp.raw.decode_content = True  # undo gzip/deflate for the stream reader
+                data = parse(resp.raw, int(resp.headers.get("Content-Length") or 0))
+            etag, modified = resp.headers.get("ETag"), resp.headers.get("Last-Modified")
     except Exception as e:
         logger.error(f"Failed to fetch JSON from {url}: {e}", exc_info=True)
         return None
+    if etag or modified:
+        _url_cache[url] = (etag, modified, data)
+    else:
+        _url_cache.pop(url, None)
+    return data
 
 def _local_path_for_guild(guild_id: int) -> Path:
     """Per-guild linked players file (local)."""
@@ -44,25 +84,89 @@ def _normalize_links_map(raw: Any) -> Dict[str, Dict[str, Any]]:
     if not isinstance(raw, dict):
         return out
     for did, rec in raw.items():
-        if isinstance(rec, str):
-            out[str(did)] = {"gamertag": rec}
-        elif isinstance(rec, dict):
-            # Ensure 'gamertag' key exists if there’s a likely candidate
-            if "gamertag" in rec:
-                out[str(did)] = {**rec}
-            else:
-                # Try a couple heuristics (rare)
-                gt = rec.get("tag") or rec.get("name") or rec.get("xbox") or rec.get("steam")
-                if isinstance(gt, str):
-                    out[str(did)] = {"gamertag": gt, **rec}
-                else:
-                    # Keep as-is; resolve_from_any will just fail to match if no 'gamertag'
-                    out[str(did)] = {**rec}
+        norm = _normalize_link(rec)
+        if norm is not None:
+            out[str(did)] = norm
+    return out
+
+def _normalize_link(rec: Any) -> Dict[str, Any] | None:
+    """
+    One record of _normalize_links_map (None = unexpected type; skip).
+    Records already in shape are returned as-is, not copied: links maps are
+    only ever read or have whole records replaced, never edited in place.
+    """
+    if isinstance(rec, dict):
+        if "gamertag" in rec:
+            return rec
+        return _normalize_link_heuristic(rec)
+    if isinstance(rec, str):
+        return {"gamertag": rec}
+    return None
+
+def _normalize_link_heuristic(rec: Dict[str, Any]) -> Dict[str, Any]:
+    # Ensure 'gamertag' key exists if there’s a likely candidate (rare)
+    gt = rec.get("tag") or rec.get("name") or rec.get("xbox") or rec.get("steam")
+    if isinstance(gt, str):
+        return {"gamertag": gt, **rec}
+    # Keep as-is; resolve_from_any will just fail to match if no 'gamertag'
+    return rec
+
+_STREAM_MIN_BYTES = 256 * 1024  # only stream-parse link files >= 256 KiB
+
+@functools.cache
+def _ijson():
+    """ijson, imported on first big links file (optional; None if not installed)."""
+    try:
+        import ijson
+    except ImportError:
+        return None
+    return ijson
+
+def _parse_links(fh, size: int) -> Dict[str, Dict[str, Any]] | None:
+    """
+    Normalized links map from a binary stream, or None if it isn't a JSON object.
+    Big files are normalized record by record as ijson yields them, so the raw
+    document is never held in memory next to the normalized one.
+    """
+    ijson = _ijson() if size >= _STREAM_MIN_BYTES else None
+    if ijson is None:
+        data = loads(fh.read())
+        return _normalize_links_map(data) if isinstance(data, dict) else None
+    events = ijson.parse(fh, use_float=True)
+    first = next(events, None)
+    if first is None or first[1] != "start_map":
+        return None
+    out: Dict[str, Dict[str, Any]] = {}
+    for did, rec in ijson.kvitems(itertools.chain((first,), events), ""):
+        norm = _normalize_link(rec)
+        if norm is not None:
+            out[str(did)] = norm
         else:
-            # Unexpected type; skip
-            continue
+            out.pop(str(did), None)  # a later duplicate key replaces, as in a dict
     return out
 
+def _gamertag_index(links: Dict[str, Dict[str, Any]]) -> Dict[str, str]:
+    """Lower-cased gamertag -> discord id; the first record wins, as in a linear scan."""
+    by_lc: Dict[str, str] = {}
+    for did, rec in links.items():
+        gt = rec.get("gamertag")
+        if not isinstance(gt, str):
+            continue
+        by_lc.setdefault(gt.lower(), did)
+    return by_lc
+
+def _load_external_src(src: str) -> Dict[str, Dict[str, Any]] | None:
+    if src.startswith("http://") or src.startswith("https://"):
+        return _read_json_url(src, _parse_links)
+    if not os.path.isfile(src):
+        return None
+    try:
+        with open(src, "rb") as fh:
+            return _parse_links(fh, os.fstat(fh.fileno()).st_size)
+    except Exception as e:
+        logger.error(f"Failed to read JSON from {src}: {e}", exc_info=True)
+        return None
+
 def load_external_links(guild_id: int) -> Dict[str, Dict[str, Any]] | None:
     """
     Load external links map (per guild) and normalize to {id: {gamertag: ...}}.
@@ -72,13 +176,69 @@ def load_external_links(guild_id: int) -> Dict[str, Dict[str, Any]] | None:
     src = s.get("external_links_path")
     if not src:
         return None
-    if src.startswith("http://") or src.startswith("https://"):
-        data = _read_json_url(src)
-    else:
-        data = _read_json(src)
-    if isinstance(data, dict):
-        return _normalize_links_map(data)
-    return None
+    return _load_external_src(src)
+
+# --- Background refresh of external links ---
+# Commands read the parsed external map from memory; one task refreshes every
+# guild off the event loop, so /link and /whois never fetch or parse it inline.
+EXTERNAL_REFRESH_SEC = 60
+_external_store: Dict[int, Tuple[str, Dict[str, Dict[str, Any]], Dict[str, str]]] = {}  # guild_id -> (src, links, by_lc)
+_refresh_task: Optional[asyncio.Task] = None
+
+def refresh_external_links(guild_id: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Re-read the guild's external links into the in-memory store (blocking; run in a thread).
+    A failed load keeps the last good copy for the same source.
+    """
+    return _refresh_external(guild_id)[0]
+
+def _refresh_external(guild_id: int) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    src = load_settings(guild_id).get("external_links_path")
+    if not src:
+        _external_store.pop(guild_id, None)
+        return {}, {}
+    links = _load_external_src(src)
+    if links is None:
+        prev = _external_store.get(guild_id)
+        if prev and prev[0] == src:
+            return prev[1], prev[2]
+        links = {}
+    entry = (src, links, _gamertag_index(links))
+    _external_store[guild_id] = entry
+    return entry[1], entry[2]
+
+def _external_indexed(guild_id: int, src: Optional[str] = None) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    """External links + index for the guild's source (pass `src` if settings are already loaded)."""
+    if src is None:
+        src = load_settings(guild_id).get("external_links_path")
+    if not src:
+        return {}, {}
+    hit = _external_store.get(guild_id)
+    if hit and hit[0] == src:
+        return hit[1], hit[2]
+    return _refresh_external(guild_id)
+
+def get_external_links(guild_id: int) -> Dict[str, Dict[str, Any]]:
+    """
+    Cached external links map ({} if not configured). Only loads inline on the
+    first lookup for a guild or right after its source path changes.
+    """
+    return _external_indexed(guild_id)[0]
+
+async def _refresh_loop(bot) -> None:
+    while True:
+        for guild in list(bot.guilds):
+            try:
+                await asyncio.to_thread(refresh_external_links, guild.id)
+            except Exception as e:
+                logger.error(f"[Guild {guild.id}] External links refresh failed: {e}", exc_info=True)
+        await asyncio.sleep(EXTERNAL_REFRESH_SEC)
+
+def start_external_refresh(bot) -> None:
+    """Start the background refresher once (call after the bot is connected)."""
+    global _refresh_task
+    if _refresh_task is None or _refresh_task.done():
+        _refresh_task = asyncio.create_task(_refresh_loop(bot))
 
 def load_local_links(guild_id: int) -> Dict[str, Dict[str, Any]]:
     """
@@ -91,6 +251,25 @@ def load_local_links(guild_id: int) -> Dict[str, Dict[str, Any]]:
         return _normalize_links_map(data)
     return {}
 
+# guild_id -> ((mtime_ns, size), links, by_lc); rebuilt whenever the file changes.
+_local_index: Dict[int, Tuple[Tuple[int, int], Dict[str, Dict[str, Any]], Dict[str, str]]] = {}
+
+def _local_indexed(guild_id: int) -> Tuple[Dict[str, Dict[str, Any]], Dict[str, str]]:
+    """Read-only view of the local links plus their gamertag index (do not mutate)."""
+    p = _local_path_for_guild(guild_id)
+    try:
+        st = p.stat()
+    except OSError:
+        _local_index.pop(guild_id, None)
+        return {}, {}
+    key = (st.st_mtime_ns, st.st_size)
+    hit = _local_index.get(guild_id)
+    if hit and hit[0] == key:
+        return hit[1], hit[2]
+    links = load_local_links(guild_id)
+    _local_index[guild_id] = (key, links, _gamertag_index(links))
+    return links, _local_index[guild_id][2]
+
 def save_local_links(guild_id: int, obj: dict):
     """
     Save per-guild local links file. Accepts either normalized form or the flat {id:"tag"} form.
@@ -100,7 +279,7 @@ def save_local_links(guild_id: int, obj: dict):
     p.parent.mkdir(parents=True, exist_ok=True)
     try:
         normalized = _normalize_links_map(obj)
-        p.write_text(json.dumps(normalized, indent=2), encoding="utf-8")
+        atomic_write_bytes(p, dumps(normalized))
         logger.debug(f"Saved {len(normalized)} local links for guild {guild_id} -> {p}")
     except Exception as e:
         logger.error(f"Failed to save local links for guild {guild_id}: {e}", exc_info=True)
@@ -119,30 +298,28 @@ def resolve_from_any(
     s = load_settings(guild_id)
     prefer_ext = bool(s.get("prefer_external_links"))
 
-    local = load_local_links(guild_id)
-    ext = load_external_links(guild_id) or {}
+    local = _local_indexed(guild_id)
+    src = s.get("external_links_path")
+    ext = _external_indexed(guild_id, src) if src else ({}, {})
 
     sources = (ext, local) if prefer_ext else (local, ext)
 
     # by discord id
     if discord_id:
-        for src in sources:
+        for src, _ in sources:
             rec = src.get(discord_id)
             if isinstance(rec, dict):
                 gt = rec.get("gamertag")
                 if isinstance(gt, str) and gt:
                     return discord_id, gt
 
-    # by gamertag (case-insensitive)
+    # by gamertag (case-insensitive, via the pre-lowered index)
     if gamertag:
         g_lower = gamertag.lower()
-        for src in sources:
-            for did, rec in src.items():
-                if not isinstance(rec, dict):
-                    continue
-                gt = rec.get("gamertag")
-                if isinstance(gt, str) and gt.lower() == g_lower:
-                    return did, gt
+        for src, by_lc in sources:
+            did = by_lc.get(g_lower)
+            if did is not None:
+                return did, src[did]["gamertag"]
 
     return None, None
 
@@ -1,7 +1,7 @@
 # utils/live_pulse.py
 import asyncio
 import logging
-from typing import Dict, Tuple, Optional
+from typing import Dict, Tuple, Optional, Set
 
 import discord
 from utils.settings import load_settings
@@ -9,8 +9,12 @@ from tracer.tracker import subscribe_to_points
 
 logger = logging.getLogger(__name__)
 
-# key = (guild_id, gamertag_lower)
+# key = (guild_id, gamertag_lower) -> {message_id, channel_id, message, pending, task}
 _active: Dict[Tuple[int, str], Dict] = {}
+# guild_id -> gamertag_lower of its active targets (so a bulk stop needn't scan _active)
+_active_by_guild: Dict[int, Set[str]] = {}
+# Points arriving faster than this are coalesced: only the latest is shown
+PULSE_MIN_INTERVAL_SEC = 1.0
 _bot: Optional[discord.Client] = None
 
 def init(bot: discord.Client):
@@ -22,7 +26,7 @@ def init(bot: discord.Client):
     logger.debug("live_pulse initialized and subscribed to tracker events.")
 
 def _fmt_coord(x, z):
-    return f"{int(x)},{int(z)}"
+    return "%d,%d" % (x, z)  # %d truncates like int()
 
 async def _ensure_message(guild_id: int, gamertag: str) -> Optional[discord.Message]:
     if _bot is None:
@@ -30,9 +34,12 @@ async def _ensure_message(guild_id: int, gamertag: str) -> Optional[discord.Mess
     key = (guild_id, gamertag.lower())
     info = _active.get(key)
 
-    # find per-guild bounty channel from settings
-    s = load_settings(guild_id)
-    ch_id = s.get("bounty_channel_id")
+    # find per-guild bounty channel from settings (one stat() while unchanged)
+    ch_id = load_settings(guild_id).get("bounty_channel_id")
+    msg = info.get("message") if info else None
+    if msg is not None and ch_id and msg.channel.id == int(ch_id):
+        return msg  # still in the bounty channel: no get_channel/fetch_message round-trip
+
     ch = _bot.get_channel(int(ch_id)) if ch_id else None
     if not isinstance(ch, discord.TextChannel):
         logger.debug(f"[Guild {guild_id}] Bounty channel not set or not a text channel.")
@@ -41,6 +48,7 @@ async def _ensure_message(guild_id: int, gamertag: str) -> Optional[discord.Mess
     if info and "message_id" in info:
         try:
             msg = await ch.fetch_message(info["message_id"])
+            info["message"] = msg
             return msg
         except Exception:
             # fetch failed, will create a fresh message below
@@ -54,22 +62,44 @@ async def _ensure_message(guild_id: int, gamertag: str) -> Optional[discord.Mess
             color=discord.Color.orange()
         )
         msg = await ch.send(embed=embed)
-        _active[key] = {"message_id": msg.id, "channel_id": ch.id}
+        info = _active.get(key)
+        if info is not None:  # not stopped while we were sending
+            info.update(message_id=msg.id, channel_id=ch.id, message=msg)
         logger.info(f"[Guild {guild_id}] Created live pulse message for {gamertag} in #{ch.name}.")
         return msg
     except Exception as e:
         logger.error(f"[Guild {guild_id}] Failed to create live pulse message: {e}", exc_info=True)
         return None
 
-async def _on_point(guild_id, gamertag, point: dict):
-    """Called by tracker whenever a point is appended."""
+async def _on_point(guild_id, gamertag, point):
+    """Called by tracker whenever a point is appended; queues it for the target's pulse."""
     if not guild_id:
         return
     key = (guild_id, gamertag.lower())
+    info = _active.get(key)
     # Only pulse if this target is marked active
-    if key not in _active:
+    if info is None:
         return
+    info["pending"] = point  # newer points just replace one not yet shown
+    if info.get("task") is None:
+        info["task"] = asyncio.create_task(_pulse_loop(key, guild_id, gamertag))
 
+async def _pulse_loop(key: Tuple[int, str], guild_id: int, gamertag: str):
+    """Show the latest pending point, at most once per PULSE_MIN_INTERVAL_SEC; exit when idle."""
+    try:
+        while True:
+            info = _active.get(key)
+            point = info.pop("pending", None) if info is not None else None
+            if point is None:
+                return
+            await _edit_pulse(guild_id, gamertag, point)
+            await asyncio.sleep(PULSE_MIN_INTERVAL_SEC)
+    finally:
+        info = _active.get(key)
+        if info is not None and info.get("task") is asyncio.current_task():
+            info.pop("task", None)
+
+async def _edit_pulse(guild_id: int, gamertag: str, point):
     msg = await _ensure_message(guild_id, gamertag)
     if not msg:
         return
@@ -86,8 +116,12 @@ async def _on_point(guild_id, gamertag, point: dict):
         if t:
             embed.set_footer(text=f"Last update: {t}")
         await msg.edit(embed=embed)
-        logger.debug(f"[Guild {guild_id}] Live pulse updated for {gamertag} -> ({int(x)},{int(z)})")
+        if logger.isEnabledFor(logging.DEBUG):
+            logger.debug(f"[Guild {guild_id}] Live pulse updated for {gamertag} -> ({int(x)},{int(z)})")
     except Exception as e:
+        info = _active.get((guild_id, gamertag.lower()))
+        if info is not None:
+            info.pop("message", None)  # maybe deleted: re-fetch/recreate on the next point
         logger.error(f"[Guild {guild_id}] Failed to edit live pulse for {gamertag}: {e}", exc_info=True)
 
 def start_for(guild_id: int, gamertag: str):
@@ -95,18 +129,29 @@ def start_for(guild_id: int, gamertag: str):
     key = (guild_id, gamertag.lower())
     if key not in _active:
         _active[key] = {}
+        _active_by_guild.setdefault(guild_id, set()).add(key[1])
         logger.info(f"[Guild {guild_id}] Live pulse START for {gamertag}")
 
+def _cancel_pulse(info: Optional[Dict]):
+    task = info.get("task") if info else None
+    if task is not None:
+        task.cancel()
+
 def stop_for(guild_id: int, gamertag: str):
     """Stop pulsing (message remains, but no more edits)."""
     key = (guild_id, gamertag.lower())
     if key in _active:
-        _active.pop(key, None)
+        _cancel_pulse(_active.pop(key, None))
+        tags = _active_by_guild.get(guild_id)
+        if tags is not None:
+            tags.discard(key[1])
+            if not tags:
+                del _active_by_guild[guild_id]
         logger.info(f"[Guild {guild_id}] Live pulse STOP for {gamertag}")
 
 def stop_all_for_guild(guild_id: int):
-    to_remove = [k for k in _active.keys() if k[0] == guild_id]
-    for k in to_remove:
-        _active.pop(k, None)
+    to_remove = _active_by_guild.pop(guild_id, ())
+    for gt_lower in to_remove:
+        _cancel_pulse(_active.pop((guild_id, gt_lower), None))
     if to_remove:
         logger.info(f"[Guild {guild_id}] Live pulse STOP for all ({len(to_remove)} target(s))")
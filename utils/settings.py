@@ -1,8 +1,10 @@
 # utils/settings.py
-import json
+import os
 from pathlib import Path
 from typing import Dict, Any, Optional
 
+from utils.storageClient import atomic_write_bytes, loads, dumps
+
 # Legacy single-file (for migration)
 LEGACY_SETTINGS_PATH = Path("data/settings.json")
 # New per-guild directory
@@ -19,20 +21,29 @@ DEFAULT_SETTINGS = {
     "disable_local_link": False,      # 👈 NEW
 }
 
+# Per-guild in-process cache: guild_id -> ((st_mtime_ns, st_size), settings).
+# A hit costs one stat(); manual edits to the file are picked up on the next load.
+_cache_by_guild: Dict[int, tuple[tuple[int, int], Dict[str, Any]]] = {}
+
 def _path_for_guild(guild_id: int) -> Path:
     return SETTINGS_DIR / f"{guild_id}.json"
 
-def _read_json(path: Path) -> Optional[Dict[str, Any]]:
-    if not path.exists():
+def _stat_key(path: Path) -> Optional[tuple[int, int]]:
+    try:
+        st = os.stat(path)
+    except OSError:
         return None
+    return st.st_mtime_ns, st.st_size
+
+def _read_json(path: Path) -> Optional[Dict[str, Any]]:
     try:
-        return json.loads(path.read_text(encoding="utf-8"))
-    except Exception:
+        return loads(path.read_bytes())
+    except Exception:  # missing or unreadable
         return None
 
 def _write_json(path: Path, obj: Dict[str, Any]) -> None:
-    path.parent.mkdir(parents=True, exist_ok=True)
-    path.write_text(json.dumps(obj, indent=2), encoding="utf-8")
+    # atomic so a crash mid-write never leaves a truncated settings file
+    atomic_write_bytes(path, dumps(obj))
 
 def _migrate_legacy_if_present(guild_id: int) -> Optional[Dict[str, Any]]:
     """
@@ -57,9 +68,15 @@ def load_settings(guild_id: int) -> Dict[str, Any]:
     """
     Load settings for a guild. Creates a file with defaults if missing.
     Also migrates from legacy settings.json once (best effort).
+    Cached until the file's mtime/size change; callers get their own (shallow) copy.
     """
     p = _path_for_guild(guild_id)
-    data = _read_json(p)
+    key = _stat_key(p)
+    cached = _cache_by_guild.get(guild_id)
+    if cached and key is not None and cached[0] == key:
+        return dict(cached[1])
+
+    data = _read_json(p) if key is not None else None
     if data is None:
         # attempt migration, else defaults
         data = _migrate_legacy_if_present(guild_id) or DEFAULT_SETTINGS.copy()
@@ -73,10 +90,28 @@ def load_settings(guild_id: int) -> Dict[str, Any]:
             changed = True
     if changed:
         _write_json(p, data)
-    return data
+    _remember(guild_id, p, data)
+    return dict(data)
 
 def save_settings(guild_id: int, updates: Dict[str, Any]) -> Dict[str, Any]:
+    """
+    Merge `updates` into the guild's settings with a single write and return
+    the post-write state, so callers don't need a follow-up load_settings().
+    """
     data = load_settings(guild_id)
     data.update(updates)
-    _write_json(_path_for_guild(guild_id), data)
-    return data
+    p = _path_for_guild(guild_id)
+    _write_json(p, data)
+    _remember(guild_id, p, data)
+    return dict(data)
+
+def _remember(guild_id: int, path: Path, data: Dict[str, Any]) -> None:
+    key = _stat_key(path)
+    if key is None:
+        _cache_by_guild.pop(guild_id, None)
+    else:
+        _cache_by_guild[guild_id] = (key, data)
+
+def invalidate_settings(guild_id: int) -> None:
+    """Drop the cached settings for a guild (for code that writes the file itself)."""
+    _cache_by_guild.pop(guild_id, None)
@@ -1,18 +1,93 @@
 # utils/storageClient.py
 import json
+import os
+import stat
+import tempfile
 from pathlib import Path
 from typing import Any
 
+try:  # optional: C parser, several times faster on large track/link files
+    import orjson
+except ImportError:
+    orjson = None
+
+def loads(raw: str | bytes) -> Any:
+    """json.loads via orjson when available (bytes are parsed without decoding first)."""
+    if orjson is not None:
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass  # e.g. NaN/huge ints: let stdlib decide, as before
+    return json.loads(raw)
+
+def dumps(obj: Any) -> bytes:
+    """Indented (2) UTF-8 JSON, via orjson when available."""
+    if orjson is not None:
+        try:
+            return orjson.dumps(obj, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS)
+        except orjson.JSONEncodeError:
+            pass  # e.g. ints beyond 64 bits
+    return json.dumps(obj, indent=2).encode("utf-8")
+
 def load_file(path: str) -> Any:
+    return load_file_raw(path)[0]
+
+def load_file_raw(path: str) -> tuple[Any, str | None]:
+    """Like load_file, but also returns the text it parsed (None if unreadable)."""
     p = Path(path)
     if not p.exists():
-        return None
+        return None, None
+    try:
+        raw = p.read_text(encoding="utf-8")
+    except Exception:
+        return None, None
     try:
-        return json.loads(p.read_text(encoding="utf-8"))
+        return loads(raw), raw
     except Exception:
-        return None
+        return None, raw
 
-def save_file(path: str, data: Any) -> None:
+def _current_umask() -> int:
+    mask = os.umask(0)
+    os.umask(mask)
+    return mask
+
+# Read once at import (os.umask can only be queried by setting it, which isn't thread-safe).
+_UMASK = _current_umask()
+
+def atomic_write_bytes(path: str | Path, data: bytes) -> None:
+    """
+    Write via tmp + fsync + os.replace: readers (and mtime-keyed caches) only
+    ever see the old file or the complete new one, never a partial write.
+    """
     p = Path(path)
     p.parent.mkdir(parents=True, exist_ok=True)
-    p.write_text(json.dumps(data, indent=2), encoding="utf-8")
+    # unique temp name per writer, so concurrent saves never share one
+    with tempfile.NamedTemporaryFile(dir=p.parent, prefix=p.name + ".", suffix=".tmp",
+                                     delete=False) as f:
+        tmp = f.name
+        try:
+            # NamedTemporaryFile is 0600: keep the target's mode (or the umask default)
+            if hasattr(os, "fchmod"):
+                try:
+                    mode = stat.S_IMODE(os.stat(p).st_mode)
+                except FileNotFoundError:
+                    mode = 0o666 & ~_UMASK
+                os.fchmod(f.fileno(), mode)
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        except BaseException:
+            f.close()
+            os.unlink(tmp)
+            raise
+    try:
+        os.replace(tmp, p)
+    except BaseException:
+        try:
+            os.unlink(tmp)
+        except OSError:
+            pass
+        raise
+
+def save_file(path: str, data: Any) -> None:
+    atomic_write_bytes(path, dumps(data))